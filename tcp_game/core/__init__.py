@@ -1,6 +1,6 @@
 """TCP Game Core Module"""
 from .packet import Packet, create_packet, create_error_packet
-from .game_state import GameState, Player, PlayerState, ValidationResult
+from .game_state import GameState, Player, PlayerState, ValidationResult, ErrorDetails, format_error
 
 __all__ = [
     'Packet',
@@ -9,5 +9,7 @@ __all__ = [
     'GameState',
     'Player',
     'PlayerState',
-    'ValidationResult'
+    'ValidationResult',
+    'ErrorDetails',
+    'format_error'
 ]
@@ -3,10 +3,28 @@ Game State management for TCP Game
 Handles turn tracking, scoring, and packet validation
 Based on test_cases.csv requirements
 """
+from array import array
 from dataclasses import dataclass, field
-from typing import Optional, Tuple, List
+from typing import NamedTuple, Optional, Tuple, List
 from enum import Enum
 
+HISTORY_CAPACITY = 4096  # Packets kept in the timeline ring buffer
+
+# Bits packed into the per-packet flags byte of the history buffer
+_HIST_FROM_B = 1
+_HIST_IS_ERROR = 2
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+def _byte_ring() -> array:
+    return array('b', bytes(HISTORY_CAPACITY))
+
+
+def _int_ring() -> array:
+    return array('q', bytes(8 * HISTORY_CAPACITY))
+
 
 class Player(Enum):
     A = "A"
@@ -21,9 +39,161 @@ class ValidationResult(Enum):
     ERROR_RWND = "ERROR_RWND"
     ERROR_WRONG_ERROR = "ERROR_WRONG_ERROR"
     ERROR_RETRANSMIT_TOO_EARLY = "ERROR_RETRANSMIT_TOO_EARLY"
+    ERROR_LEN_EXCEEDS_RWND = "ERROR_LEN_EXCEEDS_RWND"
+    ERROR_MUST_RETRANSMIT = "ERROR_MUST_RETRANSMIT"
+    ERROR_ACK_DECREASED = "ERROR_ACK_DECREASED"
+
+
+class ErrorDetails(NamedTuple):
+    """Values referenced by the error message templates"""
+    seq: int
+    ack: int
+    length: int
+    rwnd: int
+    expected_seq: int
+    dup_acks: int
+    last_ack: int
+    opp_rwnd: int
+    max_ack: int
+
+
+_ERROR_TEMPLATES = {
+    ValidationResult.ERROR_RWND: "INVALID RWND: {0.rwnd} is negative",
+    ValidationResult.ERROR_LEN: "INVALID LENGTH: {0.length} is negative",
+    ValidationResult.ERROR_LEN_EXCEEDS_RWND: "LENGTH {0.length} EXCEEDS OPPONENT RWND {0.opp_rwnd}",
+    ValidationResult.ERROR_RETRANSMIT_TOO_EARLY: "RETRANSMIT BEFORE 3 DUP ACKS: seq={0.seq}, expected={0.expected_seq}, dup_acks={0.dup_acks}",
+    ValidationResult.ERROR_SEQ: "INVALID SEQ: expected {0.expected_seq}, got {0.seq}",
+    ValidationResult.ERROR_MUST_RETRANSMIT: "MUST RETRANSMIT AFTER 3 DUP ACKS: got seq={0.seq}, should retransmit earlier packet",
+    ValidationResult.ERROR_ACK_DECREASED: "ACK DECREASED: {0.ack} < previous {0.last_ack} (ACKs must be cumulative)",
+    ValidationResult.ERROR_ACK: "INVALID ACK: {0.ack} exceeds max valid {0.max_ack}",
+    ValidationResult.ERROR_WRONG_ERROR: "WRONG ERROR: Opponent's packet was valid",
+    ValidationResult.VALID: "PACKET IS VALID",
+}
+
+
+def format_error(result: ValidationResult, details: Optional[ErrorDetails] = None) -> str:
+    """Build the human readable message for a validation result"""
+    return _ERROR_TEMPLATES[result].format(details)
+
+
+# Result codes returned by _validate_core
+_CODE_VALID = 0
+_CODE_BAD_RWND = 1
+_CODE_BAD_LEN = 2
+_CODE_LEN_OVER_RWND = 3
+_CODE_EARLY_RETRANSMIT = 4
+_CODE_SEQ_AHEAD = 5
+_CODE_MUST_RETRANSMIT = 6
+_CODE_ACK_DECREASED = 7
+_CODE_ACK_TOO_HIGH = 8
+_CODE_WRONG_ERROR = 9
+
+# ValidationResult for each code (index = code)
+_RESULT_BY_CODE = (
+    ValidationResult.VALID,
+    ValidationResult.ERROR_RWND,
+    ValidationResult.ERROR_LEN,
+    ValidationResult.ERROR_LEN_EXCEEDS_RWND,
+    ValidationResult.ERROR_RETRANSMIT_TOO_EARLY,
+    ValidationResult.ERROR_SEQ,
+    ValidationResult.ERROR_MUST_RETRANSMIT,
+    ValidationResult.ERROR_ACK_DECREASED,
+    ValidationResult.ERROR_ACK,
+    ValidationResult.ERROR_WRONG_ERROR,
+)
+_CODE_BY_RESULT = {result: code for code, result in enumerate(_RESULT_BY_CODE)}
 
 
-@dataclass
+def _validate_core(seq: int, ack: int, length: int, rwnd: int,
+                   next_seq: int, dup_ack_count: int, last_ack_sent: int,
+                   opp_rwnd: int, max_valid_ack: int) -> int:
+    """
+    Integer-only core of GameState.validate_packet.
+    Takes the packet fields plus the sender/opponent values the rules need
+    and returns a _CODE_* value (first rule violated, or _CODE_VALID).
+    """
+    # Rule 1: rwnd must be non-negative (TC6)
+    if rwnd < 0:
+        return _CODE_BAD_RWND
+    
+    # Rule 2: length must be non-negative
+    if length < 0:
+        return _CODE_BAD_LEN
+    
+    # Rule 3: length must not exceed opponent's rwnd (flow control)
+    if length > opp_rwnd:
+        return _CODE_LEN_OVER_RWND
+    
+    # Rule 4: Check for valid retransmit or normal sequence
+    if seq != next_seq:
+        # Could be a retransmit
+        if seq < next_seq:
+            # Retransmit is only allowed after 3 duplicate ACKs (TC3, TC5)
+            if dup_ack_count < 3:
+                return _CODE_EARLY_RETRANSMIT
+            # Valid retransmit after 3 dup ACKs - allowed
+        else:
+            # seq jumped ahead - invalid
+            return _CODE_SEQ_AHEAD
+    elif dup_ack_count >= 3:
+        # Normal sequence - but if we have 3+ dup ACKs, we MUST retransmit
+        return _CODE_MUST_RETRANSMIT
+    
+    # Rule 5: ACK must be cumulative (cannot decrease)
+    if ack < last_ack_sent:
+        return _CODE_ACK_DECREASED
+    
+    # Rule 6: ACK validation - can't ack more than what was sent
+    if ack > max_valid_ack:
+        return _CODE_ACK_TOO_HIGH
+    
+    return _CODE_VALID
+
+
+def _history_dict(rings: Tuple[array, ...], slot: int) -> dict:
+    """Timeline dict for one ring slot; rings are (flags, code, seq, ack, len, rwnd)"""
+    flags, code, seq, ack, length, rwnd = rings
+    sender = "B" if flags[slot] & _HIST_FROM_B else "A"
+    if flags[slot] & _HIST_IS_ERROR:
+        return {"sender": sender, "type": "ERROR", "valid": code[slot] == _CODE_VALID}
+    return {
+        "sender": sender,
+        "seq": seq[slot],
+        "ack": ack[slot],
+        "len": length[slot],
+        "rwnd": rwnd[slot],
+        "valid": code[slot] == _CODE_VALID
+    }
+
+
+class HistorySnapshot:
+    """
+    Frozen copy of part of a GameState's packet history. Taking one only
+    copies the ring slots it covers, oldest first; the dicts are built
+    later by to_list(), which is safe to call from another thread.
+    """
+    __slots__ = ("_rings", "_start", "_count")
+    
+    def __init__(self, rings: Tuple[array, ...], start: int, count: int):
+        self._rings = rings
+        self._start = start
+        self._count = count
+    
+    def __len__(self) -> int:
+        return self._count - self._start
+    
+    @property
+    def start(self) -> int:
+        """Absolute index of the first packet in the snapshot"""
+        return self._start
+    
+    def to_list(self) -> List[dict]:
+        """Packets as timeline dicts (oldest first), same as GameState.packet_history"""
+        rings = self._rings
+        return [_history_dict(rings, i) for i in range(self._count - self._start)]
+
+
+@dataclass(slots=True)
 class PlayerState:
     """State for one player"""
     next_seq: int = 0  # Next sequence number this player should send
@@ -36,75 +206,186 @@ class PlayerState:
     bytes_sent_total: int = 0  # Total bytes sent by this player
 
 
-@dataclass
+@dataclass(slots=True)
 class GameState:
     """Main game state tracking both players"""
-    current_turn: Player = Player.A
+    a_is_current: bool = True  # True while it is Player A's turn
     score_a: int = 0
     score_b: int = 0
     
-    # Player states
-    player_a: PlayerState = field(default_factory=PlayerState)
-    player_b: PlayerState = field(default_factory=PlayerState)
+    # Player states, indexed 0 = A, 1 = B (see player_a / player_b)
+    players: List[PlayerState] = field(default_factory=lambda: [PlayerState(), PlayerState()])
     
-    # Track last packets for validation
-    last_packet_from_a: Optional[dict] = None
-    last_packet_from_b: Optional[dict] = None
+    # Track last packets for validation (history indices, -1 = none yet)
+    _last_index_from_a: int = field(default=-1, init=False, repr=False)
+    _last_index_from_b: int = field(default=-1, init=False, repr=False)
     
     # Track if last opponent packet was invalid (for ERROR validation)
     opponent_sent_invalid: bool = False
-    last_validation_error: Optional[str] = None
+    _last_error: Optional[Tuple[ValidationResult, ErrorDetails]] = field(default=None, init=False, repr=False)
     who_sent_invalid: Optional[Player] = None  # Track who sent the invalid packet
     
-    # History of all packets for timeline
-    packet_history: List[dict] = field(default_factory=list)
+    # History of packets for timeline, kept as parallel arrays in a
+    # fixed-size ring buffer (see get_history for the dict view)
+    _hist_flags: array = field(default_factory=_byte_ring, init=False, repr=False)
+    _hist_seq: array = field(default_factory=_int_ring, init=False, repr=False)
+    _hist_ack: array = field(default_factory=_int_ring, init=False, repr=False)
+    _hist_len: array = field(default_factory=_int_ring, init=False, repr=False)
+    _hist_rwnd: array = field(default_factory=_int_ring, init=False, repr=False)
+    _hist_code: array = field(default_factory=_byte_ring, init=False, repr=False)  # _CODE_* result
+    _hist_write: int = field(default=0, init=False, repr=False)
+    _hist_count: int = field(default=0, init=False, repr=False)  # Total packets ever recorded
     
     # Track what each player has received (for ACK validation)
     a_received_bytes: int = 0  # Total bytes A has received from B
     b_received_bytes: int = 0  # Total bytes B has received from A
     
-    # Track last ACK sent by each player for duplicate detection (None = no packet yet)
-    last_ack_from_a: Optional[int] = None
-    last_ack_from_b: Optional[int] = None
+    # Last ACK sent by each player (0 = A, 1 = B) for duplicate detection (None = no packet yet)
+    last_acks: List[Optional[int]] = field(default_factory=lambda: [None, None])
     
     # Game status
     game_over: bool = False
     
     def reset(self):
         """Reset game to initial state"""
-        self.current_turn = Player.A
+        self.a_is_current = True
         self.score_a = 0
         self.score_b = 0
-        self.player_a = PlayerState()
-        self.player_b = PlayerState()
-        self.last_packet_from_a = None
-        self.last_packet_from_b = None
+        self.players = [PlayerState(), PlayerState()]
+        self._last_index_from_a = -1
+        self._last_index_from_b = -1
         self.opponent_sent_invalid = False
-        self.last_validation_error = None
+        self._last_error = None
         self.who_sent_invalid = None
-        self.packet_history = []
+        self._hist_write = 0
+        self._hist_count = 0
         self.a_received_bytes = 0
         self.b_received_bytes = 0
-        self.last_ack_from_a = 0
-        self.last_ack_from_b = 0
+        self.last_acks = [0, 0]
         self.game_over = False
     
+    @property
+    def current_turn(self) -> Player:
+        """Player whose turn it is (derived from a_is_current)"""
+        return Player.A if self.a_is_current else Player.B
+    
+    @current_turn.setter
+    def current_turn(self, player: Player):
+        self.a_is_current = player is Player.A
+    
+    @property
+    def player_a(self) -> PlayerState:
+        return self.players[0]
+    
+    @property
+    def player_b(self) -> PlayerState:
+        return self.players[1]
+    
+    @property
+    def packet_history(self) -> List[dict]:
+        """All retained packets as dicts (oldest first)"""
+        return self.get_history()
+    
+    @property
+    def history_count(self) -> int:
+        """Total number of packets recorded since the last reset"""
+        return self._hist_count
+    
+    @property
+    def last_validation_error(self) -> Optional[str]:
+        """Message for the last invalid packet (formatted on demand)"""
+        if self._last_error is None:
+            return None
+        return format_error(*self._last_error)
+    
+    @property
+    def last_packet_from_a(self) -> Optional[dict]:
+        return self._history_entry(self._last_index_from_a)
+    
+    @property
+    def last_packet_from_b(self) -> Optional[dict]:
+        return self._history_entry(self._last_index_from_b)
+    
+    def get_history(self, start: int = 0) -> List[dict]:
+        """
+        Rebuild packet dicts for the timeline from the ring buffer.
+        start is an absolute packet index; negative values count from the end.
+        Packets older than HISTORY_CAPACITY are no longer available.
+        """
+        count = self._hist_count
+        if start < 0:
+            start += count
+        start = max(start, count - HISTORY_CAPACITY, 0)
+        return [self._history_entry(i) for i in range(start, count)]
+    
+    def history_snapshot(self, start: int = 0) -> HistorySnapshot:
+        """
+        Copy of the retained history from absolute index start (negative
+        counts from the end, as in get_history) whose dicts can be built
+        later, see HistorySnapshot.
+        """
+        rings = (self._hist_flags, self._hist_code, self._hist_seq,
+                 self._hist_ack, self._hist_len, self._hist_rwnd)
+        count = self._hist_count
+        if start < 0:
+            start += count
+        start = max(start, count - HISTORY_CAPACITY, 0)
+        # Just the covered slots (usually a packet or two), unwrapped
+        first = start % HISTORY_CAPACITY
+        end = first + count - start
+        if end <= HISTORY_CAPACITY:
+            copies = tuple(ring[first:end] for ring in rings)
+        else:
+            end -= HISTORY_CAPACITY
+            copies = tuple(ring[first:] + ring[:end] for ring in rings)
+        return HistorySnapshot(copies, start, count)
+    
+    def _history_entry(self, index: int) -> Optional[dict]:
+        """Build the timeline dict for one absolute history index"""
+        if index < 0 or index < self._hist_count - HISTORY_CAPACITY:
+            return None
+        rings = (self._hist_flags, self._hist_code, self._hist_seq,
+                 self._hist_ack, self._hist_len, self._hist_rwnd)
+        return _history_dict(rings, index % HISTORY_CAPACITY)
+    
+    def _record_packet(self, flags: int, seq: int, ack: int, length: int, rwnd: int, code: int) -> int:
+        """Store one packet in the history ring buffer, returns its absolute index"""
+        slot = self._hist_write
+        self._hist_flags[slot] = flags
+        self._hist_code[slot] = code
+        try:
+            self._hist_seq[slot] = seq
+            self._hist_ack[slot] = ack
+            self._hist_len[slot] = length
+            self._hist_rwnd[slot] = rwnd
+        except OverflowError:
+            # Absurdly large user input - clamp for display only
+            self._hist_seq[slot] = min(max(seq, _INT64_MIN), _INT64_MAX)
+            self._hist_ack[slot] = min(max(ack, _INT64_MIN), _INT64_MAX)
+            self._hist_len[slot] = min(max(length, _INT64_MIN), _INT64_MAX)
+            self._hist_rwnd[slot] = min(max(rwnd, _INT64_MIN), _INT64_MAX)
+        self._hist_write = (slot + 1) % HISTORY_CAPACITY
+        index = self._hist_count
+        self._hist_count = index + 1
+        return index
+    
     def get_current_player_state(self) -> PlayerState:
         """Get current player's state"""
-        return self.player_a if self.current_turn == Player.A else self.player_b
+        return self.players[not self.a_is_current]
     
     def get_opponent_player_state(self) -> PlayerState:
         """Get opponent's state"""
-        return self.player_b if self.current_turn == Player.A else self.player_a
+        return self.players[self.a_is_current]
     
     def switch_turn(self):
         """Switch to other player's turn"""
-        self.current_turn = Player.B if self.current_turn == Player.A else Player.A
+        self.a_is_current = not self.a_is_current
     
-    def validate_packet(self, seq: int, ack: int, length: int, rwnd: int) -> Tuple[bool, str]:
+    def validate_packet(self, seq: int, ack: int, length: int, rwnd: int) -> Tuple[bool, ValidationResult, Optional[ErrorDetails]]:
         """
         Validate an incoming packet from current player.
-        Returns (is_valid, error_message)
+        Returns (is_valid, result, details) - pass result/details to
+        format_error() when a readable message is needed.
         
         Validation rules based on test_cases.csv:
         - rwnd must be >= 0 (TC6 catches -5)
@@ -117,53 +398,23 @@ class GameState:
         current = self.get_current_player_state()
         opponent = self.get_opponent_player_state()
         
-        # Rule 1: rwnd must be non-negative (TC6)
-        if rwnd < 0:
-            return False, f"INVALID RWND: {rwnd} is negative"
-        
-        # Rule 2: length must be non-negative
-        if length < 0:
-            return False, f"INVALID LENGTH: {length} is negative"
-        
-        # Rule 3: length must not exceed opponent's rwnd (flow control)
-        if length > opponent.rwnd:
-            return False, f"LENGTH {length} EXCEEDS OPPONENT RWND {opponent.rwnd}"
-        
-        # Rule 4: Check for valid retransmit or normal sequence
-        expected_seq = current.next_seq
-        
-        if seq != expected_seq:
-            # Could be a retransmit
-            if seq < expected_seq:
-                # Retransmit is only allowed after 3 duplicate ACKs (TC3, TC5)
-                if current.dup_ack_count < 3:
-                    return False, f"RETRANSMIT BEFORE 3 DUP ACKS: seq={seq}, expected={expected_seq}, dup_acks={current.dup_ack_count}"
-                # Valid retransmit after 3 dup ACKs - allowed
-            else:
-                # seq jumped ahead - invalid
-                return False, f"INVALID SEQ: expected {expected_seq}, got {seq}"
-        else:
-            # Normal sequence - but if we have 3+ dup ACKs, we MUST retransmit
-            if current.dup_ack_count >= 3:
-                return False, f"MUST RETRANSMIT AFTER 3 DUP ACKS: got seq={seq}, should retransmit earlier packet"
-        
-        # Rule 5: ACK must be cumulative (cannot decrease)
-        if ack < current.last_ack_sent:
-            return False, f"ACK DECREASED: {ack} < previous {current.last_ack_sent} (ACKs must be cumulative)"
-        
-        # Rule 6: ACK validation - can't ack more than what was sent
         # A can only ACK bytes that B has sent, and vice versa
-        if self.current_turn == Player.A:
-            # A is sending - A's ack should not exceed what B has sent
-            max_valid_ack = self.player_b.bytes_sent_total
-        else:
-            # B is sending - B's ack should not exceed what A has sent
-            max_valid_ack = self.player_a.bytes_sent_total
+        max_valid_ack = opponent.bytes_sent_total
         
-        if ack > max_valid_ack:
-            return False, f"INVALID ACK: {ack} exceeds max valid {max_valid_ack}"
+        code = _validate_core(
+            seq, ack, length, rwnd,
+            current.next_seq, current.dup_ack_count, current.last_ack_sent,
+            opponent.rwnd, max_valid_ack
+        )
+        if code == _CODE_VALID:
+            return True, ValidationResult.VALID, None
         
-        return True, "PACKET IS VALID"
+        details = ErrorDetails(
+            seq, ack, length, rwnd,
+            current.next_seq, current.dup_ack_count, current.last_ack_sent,
+            opponent.rwnd, max_valid_ack
+        )
+        return False, _RESULT_BY_CODE[code], details
     
     def validate_error_packet(self) -> Tuple[bool, str]:
         """
@@ -175,19 +426,20 @@ class GameState:
             return True, f"CORRECT ERROR: {self.last_validation_error}"
         return False, "WRONG ERROR: Opponent's packet was valid"
     
-    def process_packet(self, seq: int, ack: int, length: int, rwnd: int, is_error: bool = False) -> Tuple[bool, str, int, int]:
+    def process_packet(self, seq: int, ack: int, length: int, rwnd: int, is_error: bool = False) -> Tuple[bool, str, int, int, dict]:
         """
         Process a packet from current player.
-        Returns (is_valid, message, score_a, score_b)
+        Returns (is_valid, message, score_a, score_b, packet_info) where
+        packet_info is the history entry recorded for this packet.
         """
-        sender = self.current_turn
+        sender_is_a = self.a_is_current
         
         # Handle ERROR packet
         if is_error:
             is_valid, message = self.validate_error_packet()
             if is_valid:
                 # Correct error detection - sender (who detected) gets +1
-                if sender == Player.A:
+                if sender_is_a:
                     self.score_a += 1
                     message = f"Player A correctly detected error (+1)"
                 else:
@@ -195,7 +447,7 @@ class GameState:
                     message = f"Player B correctly detected error (+1)"
             else:
                 # Wrong error - sender gets -1
-                if sender == Player.A:
+                if sender_is_a:
                     self.score_a -= 1
                     message = f"Player A sent wrong ERROR (-1)"
                 else:
@@ -203,11 +455,10 @@ class GameState:
                     message = f"Player B sent wrong ERROR (-1)"
             
             # Record in history
-            self.packet_history.append({
-                "sender": sender.value,
-                "type": "ERROR",
-                "valid": is_valid
-            })
+            index = self._record_packet(
+                _HIST_IS_ERROR if sender_is_a else _HIST_IS_ERROR | _HIST_FROM_B,
+                0, 0, 0, 0, _CODE_VALID if is_valid else _CODE_WRONG_ERROR
+            )
             
             self.opponent_sent_invalid = False
             
@@ -218,27 +469,19 @@ class GameState:
                 self.switch_turn()
             # If not valid, don't switch - sender continues
             
-            return is_valid, message, self.score_a, self.score_b
+            return is_valid, message, self.score_a, self.score_b, self._history_entry(index)
         
         # Regular packet validation
-        is_valid, error_msg = self.validate_packet(seq, ack, length, rwnd)
+        is_valid, result, details = self.validate_packet(seq, ack, length, rwnd)
         
         # Record packet info
-        packet_info = {
-            "sender": sender.value,
-            "seq": seq,
-            "ack": ack,
-            "len": length,
-            "rwnd": rwnd,
-            "valid": is_valid
-        }
-        self.packet_history.append(packet_info)
+        index = self._record_packet(0 if sender_is_a else _HIST_FROM_B, seq, ack, length, rwnd, _CODE_BY_RESULT[result])
         
         # Update last packet tracking
-        if sender == Player.A:
-            self.last_packet_from_a = packet_info
+        if sender_is_a:
+            self._last_index_from_a = index
         else:
-            self.last_packet_from_b = packet_info
+            self._last_index_from_b = index
         
         current = self.get_current_player_state()
         opponent = self.get_opponent_player_state()
@@ -247,7 +490,7 @@ class GameState:
             # Check if opponent sent an invalid packet that we didn't catch with ERROR
             # If so, the opponent (who sent invalid) gets +1 for undetected error
             if self.opponent_sent_invalid and self.who_sent_invalid:
-                if self.who_sent_invalid == Player.A:
+                if self.who_sent_invalid is Player.A:
                     self.score_a += 1
                     message = "PACKET IS VALID (WARNING: A's previous error went undetected, A +1)"
                 else:
@@ -271,40 +514,27 @@ class GameState:
                 current.bytes_sent_total = seq + length
             
             # Track duplicate ACKs for fast retransmit (TC3, TC5)
-            # When opponent sends the SAME ACK multiple times, the receiver should retransmit
-            if sender == Player.A:
-                # A is sending - track A's acks for B to detect duplicates
-                if self.last_ack_from_a is not None and ack == self.last_ack_from_a:
-                    # A sent same ack again - this is a duplicate ACK that B receives
-                    self.player_b.dup_ack_count += 1
-                else:
-                    # A sent different ack - reset B's dup count
-                    self.player_b.dup_ack_count = 0
-                self.last_ack_from_a = ack
-            else:
-                # B is sending - track B's acks for A to detect duplicates
-                if self.last_ack_from_b is not None and ack == self.last_ack_from_b:
-                    # B sent same ack again - this is a duplicate ACK that A receives
-                    self.player_a.dup_ack_count += 1
-                else:
-                    # B sent different ack - reset A's dup count
-                    self.player_a.dup_ack_count = 0
-                self.last_ack_from_b = ack
+            # When the sender repeats its previous ACK, the receiver (opponent)
+            # sees a duplicate ACK and should retransmit; a new ACK resets the count
+            me = 0 if sender_is_a else 1
+            opponent.dup_ack_count = opponent.dup_ack_count + 1 if ack == self.last_acks[me] else 0
+            self.last_acks[me] = ack
             
             # Check if rwnd is 0 - don't switch turn, sender must send rwnd update
             if rwnd == 0:
                 message = "PACKET IS VALID (rwnd=0, waiting for update)"
                 # Don't switch turn - same player must send rwnd > 0 next
-                return is_valid, message, self.score_a, self.score_b
+                return is_valid, message, self.score_a, self.score_b, self._history_entry(index)
         else:
             # Invalid packet - set flag so opponent can send ERROR
             self.opponent_sent_invalid = True
-            self.who_sent_invalid = sender  # Remember who sent the invalid packet
-            self.last_validation_error = error_msg
+            self.who_sent_invalid = Player.A if sender_is_a else Player.B  # Remember who sent the invalid packet
+            self._last_error = (result, details)
+            error_msg = format_error(result, details)
             
             # Check if this is an early retransmit (TC-3) - apply automatic -1 penalty
-            if "RETRANSMIT BEFORE 3 DUP ACKS" in error_msg:
-                if sender == Player.A:
+            if result is ValidationResult.ERROR_RETRANSMIT_TOO_EARLY:
+                if sender_is_a:
                     self.score_a -= 1
                     message = f"PACKET ERROR: {error_msg} (A -1 for early retransmit)"
                 else:
@@ -314,11 +544,11 @@ class GameState:
                 message = f"PACKET ERROR: {error_msg}"
         
         self.switch_turn()
-        return is_valid, message, self.score_a, self.score_b
+        return is_valid, message, self.score_a, self.score_b, self._history_entry(index)
     
     def apply_timeout_penalty(self) -> str:
         """Apply -1 penalty to current player for timeout"""
-        if self.current_turn == Player.A:
+        if self.a_is_current:
             self.score_a -= 1
             return "TIMEOUT: Player A -1"
         else:
@@ -346,23 +576,23 @@ def test_validator():
     
     # TC1: Normal valid exchange
     # A sends: seq=0, ack=0, len=10, rwnd=50
-    is_valid, msg, _, _ = state.process_packet(0, 0, 10, 50)
+    is_valid, msg, _, _, _ = state.process_packet(0, 0, 10, 50)
     print(f"TC1 A->B: {msg}")
     assert is_valid, f"TC1 A packet should be valid: {msg}"
     
     # B responds: seq=0, ack=10, len=10, rwnd=40
-    is_valid, msg, _, _ = state.process_packet(0, 10, 10, 40)
+    is_valid, msg, _, _, _ = state.process_packet(0, 10, 10, 40)
     print(f"TC1 B->A: {msg}")
     assert is_valid, f"TC1 B packet should be valid: {msg}"
     
     # Test ACK validation
     state2 = GameState()
     # A sends: seq=0, ack=0, len=10, rwnd=50
-    is_valid, msg, _, _ = state2.process_packet(0, 0, 10, 50)
+    is_valid, msg, _, _, _ = state2.process_packet(0, 0, 10, 50)
     print(f"ACK Test A->B: {msg}")
     
     # B sends invalid ack=20 (should be max 10)
-    is_valid, msg, _, _ = state2.process_packet(0, 20, 10, 40)
+    is_valid, msg, _, _, _ = state2.process_packet(0, 20, 10, 40)
     print(f"ACK Test B->A (ack=20, should be invalid): valid={is_valid}, {msg}")
     assert not is_valid, f"B's ack=20 should be invalid, A only sent 10 bytes"
     
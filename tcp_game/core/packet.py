@@ -1,12 +1,13 @@
 """
 Packet model for TCP Game
 Contains only seq, ack, len, rwnd fields (no data payload)
+Packets are immutable - use dataclasses.replace() to derive a changed copy
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Packet:
     """Represents a TCP-like packet with seq, ack, len, rwnd"""
     seq: int
@@ -15,26 +16,48 @@ class Packet:
     rwnd: int
     is_error: bool = False
     
+    # Lazily built display values (safe to keep since fields never change)
+    _dict_cache: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+    _str_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _hash: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash((self.seq, self.ack, self.length, self.rwnd, self.is_error)))
+        return self._hash
+    
     def __str__(self):
-        if self.is_error:
-            return "ERROR"
-        return f"seq={self.seq}, ack={self.ack}, len={self.length}, rwnd={self.rwnd}"
+        if self._str_cache is None:
+            if self.is_error:
+                text = "ERROR"
+            else:
+                text = f"seq={self.seq}, ack={self.ack}, len={self.length}, rwnd={self.rwnd}"
+            object.__setattr__(self, "_str_cache", text)
+        return self._str_cache
     
     def to_dict(self):
-        """Convert to dictionary for display"""
-        if self.is_error:
-            return {"type": "ERROR"}
-        return {
-            "seq": self.seq,
-            "ack": self.ack,
-            "len": self.length,
-            "rwnd": self.rwnd
-        }
+        """Convert to dictionary for display (cached - do not mutate the result)"""
+        if self._dict_cache is None:
+            if self.is_error:
+                info = {"type": "ERROR"}
+            else:
+                info = {
+                    "seq": self.seq,
+                    "ack": self.ack,
+                    "len": self.length,
+                    "rwnd": self.rwnd
+                }
+            object.__setattr__(self, "_dict_cache", info)
+        return self._dict_cache
+
+
+# All ERROR packets are identical, so share one instance
+_ERROR_PACKET = Packet(seq=0, ack=0, length=0, rwnd=0, is_error=True)
 
 
 def create_error_packet() -> Packet:
     """Create an ERROR packet (no seq, ack, len, rwnd)"""
-    return Packet(seq=0, ack=0, length=0, rwnd=0, is_error=True)
+    return _ERROR_PACKET
 
 
 def create_packet(seq: int, ack: int, length: int, rwnd: int) -> Packet:
@@ -2,25 +2,67 @@
 Client Window for TCP Game - Player B (Client)
 Connects to host and receives game state updates
 """
+import argparse
+import math
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk
 import time
-import sys
-import os
-
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from collections import deque
+from typing import Iterable, List, Optional
 
 from tcp_game.core.game_state import Player
+from tcp_game.gui.styles import configure_styles
 from tcp_game.gui.timeline_canvas import TimelineCanvas
+from tcp_game.gui.window_base import WindowBase
 from tcp_game.networking.client import SocketClient
 
+# State update fields read by the client, with the default used when absent
+# (order matches the unpacking in ClientWindow._handle_state_update)
+_STATE_FIELDS = (
+    ("current_turn", "A"),
+    ("score_a", 0),
+    ("score_b", 0),
+    ("player_b_rwnd", 50),
+    ("player_a_rwnd", 50),
+    ("player_b_next_seq", 0),
+    ("opponent_sent_invalid", False),
+    ("game_time_left", 300),
+    ("game_over", False),
+    ("last_message", ""),
+    ("last_valid", True),
+    ("reset_timer", True),
+    ("packet_history", ()),
+    ("history_start", 0),
+)
+
+# Everything the host may send, including fields the client ignores
+_KNOWN_STATE_KEYS = frozenset(key for key, _ in _STATE_FIELDS) | {
+    "type", "player_a_next_seq", "player_a_bytes_sent", "player_b_bytes_sent",
+}
+
+# Turn timer label text by seconds left (0..45), built once
+_SECOND_STRS = tuple(f"{i}s" for i in range(46))
+
 
-class ClientWindow:
+class ClientWindow(WindowBase):
     """Window for Player B (Client) - connects to host"""
     
+    LOG_MAX_LINES = 200  # Oldest log lines are dropped beyond this
+    
+    # Foreground colors for turn/timer labels
+    _COLOR_HOT = "#ff4444"
+    _COLOR_WARN = "#ffd93d"
+    _COLOR_OK = "#4ade80"
+    _COLOR_IDLE = "#888888"
+    _COLOR_TEXT = "#e0e0e0"
+    
+    # Turn timer color on my turn, indexed by seconds left (0..45)
+    _TIMER_COLOR_MY = (_COLOR_HOT,) * 11 + (_COLOR_WARN,) * 10 + (_COLOR_OK,) * 25
+    # Game timer colors indexed by how many thresholds the time left is above
+    _GAME_TIMER_BANDS = (_COLOR_HOT, _COLOR_WARN, _COLOR_TEXT)  # <=30s, <=60s, more
+    
     def __init__(self, root: tk.Tk, host: str = "127.0.0.1", port: int = 5555):
-        self.root = root
+        super().__init__(root)
         self.root.title("TCP Game - Player B (Client)")
         self.root.geometry("520x650")
         self.root.minsize(450, 500)
@@ -38,9 +80,17 @@ class ClientWindow:
         self.my_next_seq = 0
         self.opponent_sent_invalid = False
         self.last_displayed_packet_count = 0
+        self._last_state_sig = None  # Signature of the last applied state update
+        self._unknown_state_keys = set()  # Already reported by _check_state_keys()
         self.game_time_left = 300  # Initial game time (5 minutes)
         self.game_over = False
         
+        self._log_lines = 0
+        # Lines waiting for _flush_log(); never more than the log keeps
+        self._log_queue = deque(maxlen=self.LOG_MAX_LINES)
+        self._log_flush_id = None  # Pending after_idle id, if any
+        self._display_id = None  # Pending _flush_display(), see _queue_display()
+        
         # Socket client
         self.client = SocketClient()
         self.client.on_connected = self.on_connected
@@ -51,10 +101,13 @@ class ClientWindow:
         # Timer state
         self.timer_id = None
         self.game_timer_id = None  # Local game timer
+        self._game_deadline = 0.0  # time.monotonic() at which the game clock hits 0:00
         self.time_left = 45
+        self._turn_deadline = 0.0  # time.monotonic() at which the turn times out
+        self._timer_shown = None  # (time_left, is_my_turn) currently on the label
         
         # Build UI
-        self.setup_styles()
+        configure_styles(self.root)
         self.create_widgets()
         self.update_display()
         
@@ -64,22 +117,6 @@ class ClientWindow:
         # Handle window close
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
     
-    def setup_styles(self):
-        """Configure ttk styles for dark theme"""
-        style = ttk.Style()
-        style.theme_use('clam')
-        
-        style.configure("Dark.TFrame", background="#0f0f1a")
-        style.configure("Dark.TLabel", background="#0f0f1a", foreground="#e0e0e0", font=("Segoe UI", 11))
-        style.configure("Title.TLabel", background="#0f0f1a", foreground="#ff6b6b", font=("Segoe UI", 16, "bold"))
-        style.configure("Score.TLabel", background="#1a1a2e", foreground="#4ade80", font=("Consolas", 14, "bold"))
-        style.configure("Turn.TLabel", background="#1a1a2e", foreground="#ffd93d", font=("Segoe UI", 14, "bold"))
-        style.configure("Timer.TLabel", background="#1a1a2e", foreground="#ff6b6b", font=("Consolas", 18, "bold"))
-        style.configure("Status.TLabel", background="#0f0f1a", foreground="#4ade80", font=("Consolas", 10))
-        style.configure("Error.TLabel", background="#0f0f1a", foreground="#ff4444", font=("Consolas", 10))
-        style.configure("RWND.TLabel", background="#1a1a2e", foreground="#a78bfa", font=("Consolas", 12, "bold"))
-        style.configure("Network.TLabel", background="#1a1a2e", foreground="#fbbf24", font=("Consolas", 10))
-    
     def create_widgets(self):
         """Create all GUI widgets"""
         # Main container - simple pack layout
@@ -87,7 +124,7 @@ class ClientWindow:
         main_frame.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
         
         # Title
-        title_label = ttk.Label(main_frame, text="Player B (Client)", style="Title.TLabel")
+        title_label = ttk.Label(main_frame, text="Player B (Client)", style="Title.B.TLabel")
         title_label.pack(pady=(0, 3))
         
         # Network status panel
@@ -114,6 +151,9 @@ class ClientWindow:
         # Turn timer (45s countdown)
         self.timer_label = ttk.Label(score_row, text="45s", style="Timer.TLabel")
         self.timer_label.pack(side=tk.RIGHT, padx=3)
+        # Its text changes on every shown second, so it bypasses _set()
+        self._timer_configure = self.timer_label.configure
+        self._last_timer_color = None
         
         # Game timer (5:00 countdown)
         self.game_timer_label = ttk.Label(score_row, text="5:00", style="Dark.TLabel")
@@ -137,7 +177,7 @@ class ClientWindow:
         input_frame = tk.Frame(main_frame, bg="#1a1a2e", relief=tk.RIDGE, bd=1)
         input_frame.pack(fill=tk.X, pady=3)
         
-        ttk.Label(input_frame, text="Send Packet", style="Title.TLabel").pack(pady=3)
+        ttk.Label(input_frame, text="Send Packet", style="Title.B.TLabel").pack(pady=3)
         
         # Input fields - use grid for more compact layout
         fields_frame = tk.Frame(input_frame, bg="#1a1a2e")
@@ -148,28 +188,28 @@ class ClientWindow:
         row1.pack(fill=tk.X, pady=1)
         
         ttk.Label(row1, text="SEQ:", style="Dark.TLabel", width=5).pack(side=tk.LEFT)
-        self.seq_entry = tk.Entry(row1, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
+        self.seq_var = tk.StringVar(value="0")
+        self.seq_entry = tk.Entry(row1, textvariable=self.seq_var, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
         self.seq_entry.pack(side=tk.LEFT, padx=2)
-        self.seq_entry.insert(0, "0")
         
         ttk.Label(row1, text="ACK:", style="Dark.TLabel", width=5).pack(side=tk.LEFT, padx=(8, 0))
-        self.ack_entry = tk.Entry(row1, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
+        self.ack_var = tk.StringVar(value="0")
+        self.ack_entry = tk.Entry(row1, textvariable=self.ack_var, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
         self.ack_entry.pack(side=tk.LEFT, padx=2)
-        self.ack_entry.insert(0, "0")
         
         # Row 2: LEN and RWND
         row2 = tk.Frame(fields_frame, bg="#1a1a2e")
         row2.pack(fill=tk.X, pady=1)
         
         ttk.Label(row2, text="LEN:", style="Dark.TLabel", width=5).pack(side=tk.LEFT)
-        self.len_entry = tk.Entry(row2, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
+        self.len_var = tk.StringVar(value="10")
+        self.len_entry = tk.Entry(row2, textvariable=self.len_var, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
         self.len_entry.pack(side=tk.LEFT, padx=2)
-        self.len_entry.insert(0, "10")
         
         ttk.Label(row2, text="RWND:", style="Dark.TLabel", width=6).pack(side=tk.LEFT, padx=(8, 0))
-        self.rwnd_entry = tk.Entry(row2, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
+        self.rwnd_var = tk.StringVar(value="50")
+        self.rwnd_entry = tk.Entry(row2, textvariable=self.rwnd_var, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
         self.rwnd_entry.pack(side=tk.LEFT, padx=2)
-        self.rwnd_entry.insert(0, "50")
         
         # Buttons
         btn_frame = tk.Frame(input_frame, bg="#1a1a2e")
@@ -221,57 +261,82 @@ class ClientWindow:
     
     def connect_to_host(self):
         """Connect to the host server"""
-        self.network_label.configure(text=f"🔌 Connecting to {self.host}:{self.port}...")
+        self._set(self.network_label, "network", text=f"🔌 Connecting to {self.host}:{self.port}...")
+        self.log_message(f"Connecting to {self.host}:{self.port}...")
         
-        if self.client.connect(self.host, self.port):
-            self.log_message(f"Connecting to {self.host}:{self.port}...")
-        else:
-            self.network_label.configure(text="❌ Connection failed")
-            self.log_message("Connection failed", is_error=True)
+        # Non-blocking: success arrives via on_connected, failure via on_network_error
+        self.client.connect_async(self.host, self.port)
     
     def on_connected(self):
         """Called when connected to host"""
-        self.root.after(0, self._handle_connected)
+        self._post(self._handle_connected)
     
     def _handle_connected(self):
         """Handle connection on main thread"""
-        self.network_label.configure(text=f"Connected to {self.host}:{self.port}")
+        self._set(self.network_label, "network", text=f"Connected to {self.host}:{self.port}")
         self.log_message("Connected to host!")
-        self.status_label.configure(text="Connected! Waiting for your turn...", style="Status.TLabel")
+        self._set(self.status_label, "status", text="Connected! Waiting for your turn...", style="Status.TLabel")
         self.start_timer()
         self.start_game_timer()
     
     def on_state_update(self, state: dict):
         """Called when state update received from host"""
-        self.root.after(0, lambda: self._handle_state_update(state))
+        self._post(self._handle_state_update, state)
     
     def _handle_state_update(self, state: dict):
         """Handle state update on main thread"""
-        # Update local state
-        self.current_turn = state.get("current_turn", "A")
-        self.score_a = state.get("score_a", 0)
-        self.score_b = state.get("score_b", 0)
-        self.my_rwnd = state.get("player_b_rwnd", 50)
-        self.opp_rwnd = state.get("player_a_rwnd", 50)
-        self.my_next_seq = state.get("player_b_next_seq", 0)
-        self.opponent_sent_invalid = state.get("opponent_sent_invalid", False)
+        if __debug__:
+            self._check_state_keys(state)
+        
+        (current_turn, score_a, score_b, my_rwnd, opp_rwnd, my_next_seq,
+         opponent_sent_invalid, game_time_left, game_over, last_message,
+         last_valid, reset_timer, packet_history, history_start) = (
+            state.get(key, default) for key, default in _STATE_FIELDS
+        )
+        
+        # Reject malformed updates before any of it reaches the widgets
+        if not self._validate_state(current_turn, score_a, score_b, my_rwnd, opp_rwnd,
+                                    my_next_seq, game_time_left, packet_history, history_start):
+            self.log_message("Ignored malformed state update from host", is_error=True)
+            return
         
-        # Update game timer
-        self.game_time_left = state.get("game_time_left", 300)
-        self.game_over = state.get("game_over", False)
+        # packet_history only holds the newest packets, from absolute index history_start
+        history_count = history_start + len(packet_history)
         
-        last_message = state.get("last_message", "")
-        last_valid = state.get("last_valid", True)
+        # Duplicate/keepalive update: nothing on screen would change
+        sig = (
+            current_turn, score_a, score_b, my_rwnd, opp_rwnd, my_next_seq,
+            opponent_sent_invalid, game_time_left, game_over, last_message,
+            last_valid, history_count,
+        )
+        if sig == self._last_state_sig:
+            if not game_over and reset_timer:
+                self.start_timer()
+            return
+        self._last_state_sig = sig
+        turn_changed = current_turn != self.current_turn
+        
+        # Update local state
+        self.current_turn = current_turn
+        self.score_a = score_a
+        self.score_b = score_b
+        self.my_rwnd = my_rwnd
+        self.opp_rwnd = opp_rwnd
+        self.my_next_seq = my_next_seq
+        self.opponent_sent_invalid = opponent_sent_invalid
+        
+        # Update game timer (resync the local clock to the host's)
+        self.game_time_left = game_time_left
+        self._game_deadline = time.monotonic() + game_time_left
+        self.game_over = game_over
         
         # Update timeline with new packets
-        packet_history = state.get("packet_history", [])
-        for i in range(self.last_displayed_packet_count, len(packet_history)):
-            self.timeline.add_packet(packet_history[i])
-        self.last_displayed_packet_count = len(packet_history)
+        self.timeline.add_packets(packet_history[max(self.last_displayed_packet_count - history_start, 0):])
+        self.last_displayed_packet_count = history_count
         
         # Log the message
         if last_message:
-            self.status_label.configure(
+            self._set(self.status_label, "status",
                 text=last_message,
                 style="Status.TLabel" if last_valid else "Error.TLabel"
             )
@@ -281,46 +346,74 @@ class ClientWindow:
             self.handle_game_over()
             return
         
-        # Update display
-        self.update_display()
+        # Redraw once for all updates handled in this mainloop pass
+        self._queue_display()
         
         # Only reset timer if server says to (not on RWND updates)
-        if state.get("reset_timer", True):
+        if reset_timer:
             self.start_timer()
+        elif turn_changed:
+            self.resume_timer()
+    
+    @staticmethod
+    def _validate_state(current_turn, score_a, score_b, my_rwnd, opp_rwnd,
+                        my_next_seq, game_time_left, packet_history, history_start) -> bool:
+        """Type/range check of a state update, cheapest checks first"""
+        if current_turn not in ("A", "B"):
+            return False
+        if not all(isinstance(v, int) for v in (score_a, score_b, my_rwnd, opp_rwnd, my_next_seq, game_time_left, history_start)):
+            return False
+        # Only valid packets update a player's rwnd, and those are never negative
+        if my_rwnd < 0 or opp_rwnd < 0 or game_time_left < 0 or history_start < 0:
+            return False
+        return isinstance(packet_history, (list, tuple))
+    
+    def _check_state_keys(self, state: dict):
+        """Debug aid: log (once each) state fields this client doesn't know about"""
+        unknown = state.keys() - _KNOWN_STATE_KEYS - self._unknown_state_keys
+        if unknown:
+            self._unknown_state_keys |= unknown
+            self.log_message(f"Unknown state field(s): {', '.join(sorted(unknown))}", is_error=True)
     
     def on_disconnected(self):
         """Called when disconnected from host"""
-        self.root.after(0, self._handle_disconnected)
+        self._post(self._handle_disconnected)
     
     def _handle_disconnected(self):
         """Handle disconnect on main thread"""
-        self.network_label.configure(text="❌ Disconnected from host")
+        self._set(self.network_label, "network", text="❌ Disconnected from host")
         self.log_message("Disconnected from host", is_error=True)
-        self.send_btn.configure(state=tk.DISABLED)
-        self.error_btn.configure(state=tk.DISABLED)
+        self._set(self.send_btn, "send_btn", state=tk.DISABLED)
+        self._set(self.error_btn, "error_btn", state=tk.DISABLED)
         self.stop_timer()
     
     def on_network_error(self, error: str):
         """Called on network error"""
-        self.root.after(0, lambda: self.log_message(f"Network error: {error}", is_error=True))
+        self._post(self._handle_network_error, error)
+    
+    def _handle_network_error(self, error: str):
+        """Handle network error on main thread"""
+        if not self.client.connected:
+            self._set(self.network_label, "network", text="❌ Connection failed")
+        self.log_message(f"Network error: {error}", is_error=True)
     
     def send_packet(self):
         """Send a packet to host"""
         if self.current_turn != "B":
-            self.status_label.configure(text="Not your turn!", style="Error.TLabel")
+            self._set(self.status_label, "status", text="Not your turn!", style="Error.TLabel")
             return
         
         if not self.client.connected:
-            self.status_label.configure(text="Not connected to host!", style="Error.TLabel")
+            self._set(self.status_label, "status", text="Not connected to host!", style="Error.TLabel")
             return
         
         try:
-            seq = int(self.seq_entry.get())
-            ack = int(self.ack_entry.get())
-            length = int(self.len_entry.get())
-            rwnd = int(self.rwnd_entry.get()) if self.rwnd_entry.get().strip() else self.my_rwnd
+            seq = self._parse_int(self.seq_var)
+            ack = self._parse_int(self.ack_var)
+            length = self._parse_int(self.len_var)
+            rwnd = self._parse_int(self.rwnd_var, default=self.my_rwnd)
         except ValueError:
-            self.status_label.configure(text="Invalid input - use integers", style="Error.TLabel")
+            self._set(self.status_label, "status", text="Invalid input - use integers", style="Error.TLabel")
             return
         
         # Send to host
@@ -329,94 +422,114 @@ class ClientWindow:
         # Log locally (actual result comes from server)
         packet_str = f"seq={seq} ack={ack} len={length} rwnd={rwnd}"
         self.log_message(f"📤 Sending: {packet_str}")
-        self.status_label.configure(text="Packet sent, waiting for validation...", style="Status.TLabel")
+        self._set(self.status_label, "status", text="Packet sent, waiting for validation...", style="Status.TLabel")
+    
+    @staticmethod
+    def _parse_int(var: tk.StringVar, default: Optional[int] = None) -> int:
+        """Parse an entry's variable as an optional minus sign and ASCII digits; empty gives default if one is set"""
+        text = var.get().strip()
+        if not text and default is not None:
+            return default
+        # Stricter than int(): no plus sign, no inner whitespace or underscores,
+        # no non-ASCII digits. Negative values are legal moves (the host scores them)
+        digits = text[1:] if text[:1] == "-" else text
+        if not (digits.isascii() and digits.isdigit()):
+            raise ValueError(f"not an integer: {text!r}")
+        return int(text)
     
     def send_error(self):
         """Send ERROR packet to host"""
         if self.current_turn != "B":
-            self.status_label.configure(text="Not your turn!", style="Error.TLabel")
+            self._set(self.status_label, "status", text="Not your turn!", style="Error.TLabel")
             return
         
         if not self.client.connected:
-            self.status_label.configure(text="Not connected to host!", style="Error.TLabel")
+            self._set(self.status_label, "status", text="Not connected to host!", style="Error.TLabel")
             return
         
         # Send to host
         self.client.send_packet(0, 0, 0, 0, is_error=True)
         
         self.log_message("⚠️ Sending ERROR")
-        self.status_label.configure(text="ERROR sent, waiting for validation...", style="Status.TLabel")
+        self._set(self.status_label, "status", text="ERROR sent, waiting for validation...", style="Status.TLabel")
     
     def update_display(self):
         """Update all display elements"""
         # Scores
-        self.score_a_label.configure(text=f"A: {self.score_a}")
-        self.score_b_label.configure(text=f"B: {self.score_b}")
+        self._set_text(self.score_a_label, "score_a", "A: {}".format, self.score_a)
+        self._set_text(self.score_b_label, "score_b", "B: {}".format, self.score_b)
         
         # Turn indicator
         is_my_turn = self.current_turn == "B"
         if is_my_turn:
-            self.turn_label.configure(text="YOUR TURN!", foreground="#4ade80")
+            self._set(self.turn_label, "turn", text="YOUR TURN!", foreground=self._COLOR_OK)
             if self.client.connected:
-                self.send_btn.configure(state=tk.NORMAL)
-                self.error_btn.configure(state=tk.NORMAL)
+                self._set(self.send_btn, "send_btn", state=tk.NORMAL)
+                self._set(self.error_btn, "error_btn", state=tk.NORMAL)
         else:
-            self.turn_label.configure(text="Waiting for Player A...", foreground="#888888")
-            self.send_btn.configure(state=tk.DISABLED)
-            self.error_btn.configure(state=tk.DISABLED)
+            self._set(self.turn_label, "turn", text="Waiting for Player A...", foreground=self._COLOR_IDLE)
+            self._set(self.send_btn, "send_btn", state=tk.DISABLED)
+            self._set(self.error_btn, "error_btn", state=tk.DISABLED)
         
         # RWND displays (B's perspective: my = B, opp = A)
-        self.my_rwnd_label.configure(text=f"My RWND: {self.my_rwnd}")
-        self.opp_rwnd_label.configure(text=f"Opp RWND: {self.opp_rwnd}")
-        self.rwnd_entry.delete(0, tk.END)
-        self.rwnd_entry.insert(0, str(self.my_rwnd))
+        self._set_text(self.my_rwnd_label, "my_rwnd", "My RWND: {}".format, self.my_rwnd)
+        self._set_text(self.opp_rwnd_label, "opp_rwnd", "Opp RWND: {}".format, self.opp_rwnd)
+        self._set_entry(self.rwnd_var, str(self.my_rwnd))
         
         # Update suggested values when it's my turn
         if is_my_turn:
-            self.seq_entry.delete(0, tk.END)
-            self.seq_entry.insert(0, str(self.my_next_seq))
+            self._set_entry(self.seq_var, str(self.my_next_seq))
         
         # Update game timer display
-        minutes = self.game_time_left // 60
-        seconds = self.game_time_left % 60
-        self.game_timer_label.configure(text=f"{minutes}:{seconds:02d}")
-        
-        # Color based on time left
-        if self.game_time_left <= 30:
-            self.game_timer_label.configure(foreground="#ff4444")
-        elif self.game_time_left <= 60:
-            self.game_timer_label.configure(foreground="#ffd93d")
-        else:
-            self.game_timer_label.configure(foreground="#e0e0e0")
+        self._show_game_time()
+    
+    def _queue_display(self):
+        """Schedule update_display() for when Tk goes idle (once, however often called)"""
+        if self._display_id is None:
+            self._display_id = self.root.after_idle(self._flush_display)
+    
+    def _flush_display(self):
+        """Run the update_display() queued by _queue_display()"""
+        self._display_id = None
+        # handle_game_over() has already drawn the final screen
+        if not self.game_over:
+            self.update_display()
+    
+    def _set_entry(self, var: tk.StringVar, text: str):
+        """Set an entry's variable only if its contents differ (keeps cursor/selection otherwise)"""
+        if var.get() != text:
+            var.set(text)
     
     def handle_game_over(self):
         """Handle game over state received from host"""
         self.stop_timer()
         
         # Disable buttons
-        self.send_btn.configure(state=tk.DISABLED)
-        self.error_btn.configure(state=tk.DISABLED)
+        self._set(self.send_btn, "send_btn", state=tk.DISABLED)
+        self._set(self.error_btn, "error_btn", state=tk.DISABLED)
         
         # Determine winner from client B's perspective
         if self.score_b > self.score_a:
-            self.turn_label.configure(text="YOU WIN!", foreground="#4ade80")
+            self._set(self.turn_label, "turn", text="YOU WIN!", foreground=self._COLOR_OK)
         elif self.score_a > self.score_b:
-            self.turn_label.configure(text="YOU LOSE!", foreground="#ff4444")
+            self._set(self.turn_label, "turn", text="YOU LOSE!", foreground=self._COLOR_HOT)
         else:
-            self.turn_label.configure(text="TIE GAME!", foreground="#ffd93d")
+            self._set(self.turn_label, "turn", text="TIE GAME!", foreground=self._COLOR_WARN)
         
         # Update timer display
-        self.game_timer_label.configure(text="0:00", foreground="#ff4444")
+        self._set(self.game_timer_label, "game_timer", text="0:00", foreground=self._COLOR_HOT)
+        self._last.pop(("game_timer", "value"), None)  # Next _show_game_time() must redraw
         self.log_message(f"GAME OVER - Final Score: A={self.score_a}, B={self.score_b}")
         
         # Update scores display
-        self.score_a_label.configure(text=f"A: {self.score_a}")
-        self.score_b_label.configure(text=f"B: {self.score_b}")
+        self._set_text(self.score_a_label, "score_a", "A: {}".format, self.score_a)
+        self._set_text(self.score_b_label, "score_b", "B: {}".format, self.score_b)
     
     def start_timer(self):
         """Start the 45-second countdown timer"""
         self.stop_timer()
         self.time_left = 45
+        self._turn_deadline = time.monotonic() + self.time_left
         self.update_timer()
     
     def stop_timer(self):
@@ -425,79 +538,125 @@ class ClientWindow:
             self.root.after_cancel(self.timer_id)
             self.timer_id = None
     
+    def resume_timer(self):
+        """Continue the countdown from time_left (the turn changed without a timer reset)"""
+        self.stop_timer()
+        self._turn_deadline = time.monotonic() + self.time_left
+        self.update_timer()
+    
     def update_timer(self):
-        """Update timer display"""
+        """Update timer display, waking once per second of a monotonic deadline on my turn only"""
+        self.timer_id = None
         is_my_turn = self.current_turn == "B"
+        now = time.monotonic()
         
-        self.timer_label.configure(text=f"{self.time_left}s")
-        
+        # Countdown is paused during the opponent's turn; the state update
+        # that hands the turn back restarts it
         if is_my_turn:
-            if self.time_left <= 10:
-                self.timer_label.configure(foreground="#ff4444")
-            elif self.time_left <= 20:
-                self.timer_label.configure(foreground="#ffd93d")
+            self.time_left = max(0, math.ceil(self._turn_deadline - now))
+        
+        # Only touch the label when the shown second or the turn changed
+        shown = (self.time_left, is_my_turn)
+        if shown != self._timer_shown:
+            self._timer_shown = shown
+            color = self._TIMER_COLOR_MY[self.time_left] if is_my_turn else self._COLOR_IDLE
+            if color != self._last_timer_color:
+                self._last_timer_color = color
+                self._timer_configure(text=_SECOND_STRS[self.time_left], foreground=color)
             else:
-                self.timer_label.configure(foreground="#4ade80")
-            
-            if self.time_left <= 0:
-                # Timeout - server handles penalty
-                self.log_message("⏰ TIMEOUT!", is_error=True)
-                self.start_timer()
-                return
-            
-            self.time_left -= 1
-        else:
-            self.timer_label.configure(foreground="#888888")
+                self._timer_configure(text=_SECOND_STRS[self.time_left])
+        
+        if not is_my_turn:
+            return
         
-        self.timer_id = self.root.after(1000, self.update_timer)
+        if self.time_left <= 0:
+            # Timeout - server handles penalty
+            self.log_message("⏰ TIMEOUT!", is_error=True)
+            self.start_timer()
+            return
+        
+        # Wake up just as the shown second runs out
+        delay = self._turn_deadline - now - (self.time_left - 1)
+        self.timer_id = self.root.after(max(1, math.ceil(delay * 1000)), self.update_timer)
+    
+    def _show_game_time(self):
+        """Show the game clock as M:SS, colored by time left (nothing to do if the second is unchanged)"""
+        if self._last.get(("game_timer", "value")) == self.game_time_left:
+            return
+        self._last[("game_timer", "value")] = self.game_time_left
+        minutes, seconds = divmod(self.game_time_left, 60)
+        color = self._GAME_TIMER_BANDS[(self.game_time_left > 30) + (self.game_time_left > 60)]
+        self._set(self.game_timer_label, "game_timer", text=f"{minutes}:{seconds:02d}", foreground=color)
     
     def start_game_timer(self):
         """Start the local game timer countdown"""
         if self.game_timer_id:
             self.root.after_cancel(self.game_timer_id)
+        self._game_deadline = time.monotonic() + self.game_time_left
         self.update_game_timer()
     
     def update_game_timer(self):
-        """Update game timer display every second"""
+        """Update game timer display, waking once per second of a monotonic deadline"""
         if self.game_over:
             return
         
-        # Update display (MM:SS format)
-        minutes = self.game_time_left // 60
-        seconds = self.game_time_left % 60
-        self.game_timer_label.configure(text=f"{minutes}:{seconds:02d}")
-        
-        # Color based on time left
-        if self.game_time_left <= 30:
-            self.game_timer_label.configure(foreground="#ff4444")
-        elif self.game_time_left <= 60:
-            self.game_timer_label.configure(foreground="#ffd93d")
-        else:
-            self.game_timer_label.configure(foreground="#e0e0e0")
+        now = time.monotonic()
+        self.game_time_left = max(0, math.ceil(self._game_deadline - now))
+        self._show_game_time()
         
         if self.game_time_left <= 0:
             # Game end is handled by host sending game_over state
             return
         
-        self.game_time_left -= 1
-        self.game_timer_id = self.root.after(1000, self.update_game_timer)
+        # Wake up just as the shown second runs out
+        delay = self._game_deadline - now - (self.game_time_left - 1)
+        self.game_timer_id = self.root.after(max(1, math.ceil(delay * 1000)), self.update_game_timer)
     
     def log_message(self, message: str, is_error: bool = False):
         """Add message to log"""
+        self.log_messages((message,))
+    
+    def log_messages(self, messages: Iterable[str]):
+        """Queue messages for the log; all writes in one mainloop pass share a flush"""
+        timestamp = self._timestamp()
+        self._log_queue.extend(f"[{timestamp}] {message}\n" for message in messages)
+        if self._log_queue and self._log_flush_id is None:
+            self._log_flush_id = self.root.after_idle(self._flush_log)
+    
+    def _flush_log(self):
+        """Write all queued log lines with a single insert"""
+        self._log_flush_id = None
+        if not self._log_queue:
+            return
+        text = "".join(self._log_queue)
+        self._log_queue.clear()
+        
+        # Don't yank the view back down if the user scrolled up to read
+        follow = self.log_text.yview()[1] >= 1.0
+        
         self.log_text.configure(state=tk.NORMAL)
-        timestamp = time.strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.log_text.see(tk.END)
+        self.log_text.insert(tk.END, text)
+        
+        # Keep only the newest LOG_MAX_LINES lines
+        self._log_lines += text.count("\n")
+        excess = self._log_lines - self.LOG_MAX_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+            self._log_lines -= excess
+        
+        if follow:
+            self.log_text.see(tk.END)
         self.log_text.configure(state=tk.DISABLED)
     
     def reconnect(self):
         """Reconnect to host"""
-        # Disconnect old connection (non-blocking)
-        self.client.disconnect()
+        # Drop old connection (non-blocking); callbacks stay bound
+        self.client.reset()
         
         # Reset UI state
         self.timeline.clear()
         self.last_displayed_packet_count = 0
+        self._last_state_sig = None
         self.current_turn = "A"
         self.score_a = 0
         self.score_b = 0
@@ -515,43 +674,51 @@ class ClientWindow:
         # Clear log
         self.log_text.configure(state=tk.NORMAL)
         self.log_text.delete(1.0, tk.END)
+        self._log_lines = 0
+        self._log_queue.clear()
         self.log_text.configure(state=tk.DISABLED)
         
         # Reset entries
-        self.seq_entry.delete(0, tk.END)
-        self.seq_entry.insert(0, "0")
-        self.ack_entry.delete(0, tk.END)
-        self.ack_entry.insert(0, "0")
-        self.len_entry.delete(0, tk.END)
-        self.len_entry.insert(0, "10")
-        self.rwnd_entry.delete(0, tk.END)
-        self.rwnd_entry.insert(0, "50")
+        self._set_entry(self.seq_var, "0")
+        self._set_entry(self.ack_var, "0")
+        self._set_entry(self.len_var, "10")
+        self._set_entry(self.rwnd_var, "50")
         
         self.update_display()
         
-        # Create a new client instance to avoid socket reuse issues
-        self.client = SocketClient()
-        self.client.on_connected = self.on_connected
-        self.client.on_state_update = self.on_state_update
-        self.client.on_disconnected = self.on_disconnected
-        self.client.on_error = self.on_network_error
-        
         # Connect using async method (non-blocking)
-        self.network_label.configure(text=f"🔌 Reconnecting to {self.host}:{self.port}...")
+        self._set(self.network_label, "network", text=f"🔌 Reconnecting to {self.host}:{self.port}...")
         self.log_message(f"Reconnecting to {self.host}:{self.port}...")
         self.client.connect_async(self.host, self.port)
     
     def on_close(self):
         """Handle window close"""
+        # Late network events must not reach the destroyed window: drop the
+        # callbacks, and keep _post() from scheduling any more drains
+        noop = lambda *args, **kwargs: None
+        self.client.on_connected = self.client.on_state_update = noop
+        self.client.on_disconnected = self.client.on_error = noop
+        self._drain_pending = True
+        
         self.stop_timer()
+        for after_id in (self.game_timer_id, self._drain_id, self._log_flush_id, self._display_id):
+            if after_id is not None:
+                self.root.after_cancel(after_id)
+        
         self.client.disconnect()
         self.root.destroy()
 
 
-def main(host: str = "127.0.0.1", port: int = 5555):
-    """Entry point for client window"""
+def main(argv: Optional[List[str]] = None):
+    """Entry point for client window: tcp-game-client [host_ip] [port]"""
+    parser = argparse.ArgumentParser(description="TCP Game - Client (Player B)")
+    parser.add_argument("host", nargs="?", default="127.0.0.1", help="host IP address (default: 127.0.0.1)")
+    parser.add_argument("port", nargs="?", type=int, default=5555, help="host port (default: 5555)")
+    args = parser.parse_args(argv)
+    
+    print(f"Connecting to TCP Game Host at {args.host}:{args.port}...")
     root = tk.Tk()
-    app = ClientWindow(root, host=host, port=port)
+    app = ClientWindow(root, host=args.host, port=args.port)
     root.mainloop()
 
 
@@ -2,25 +2,77 @@
 Host Window for TCP Game - Player A (Server)
 Runs the game server and accepts incoming connection from Player B
 """
+import argparse
+import math
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk
 import time
-import sys
-import os
-
-# Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import queue
+import threading
+from enum import IntEnum, IntFlag
+from collections import deque
+from typing import List, Optional
 
 from tcp_game.core.game_state import GameState, Player
+from tcp_game.gui.styles import configure_styles
 from tcp_game.gui.timeline_canvas import TimelineCanvas
+from tcp_game.gui.window_base import WindowBase
 from tcp_game.networking.server import SocketServer
+from tcp_game.networking.protocol import (
+    build_state_update, build_state_num, StateUpdate, STATE_NUM_MESSAGES
+)
+
+TURN_SECONDS = 45  # Turn timeout
+RWND_INTERVAL = 15  # Seconds between +20 rwnd increases
+LOG_MAX_LINES = 3  # Log lines shown (older lines are dropped)
+LOG_FLUSH_MS = 100  # Log label is redrawn at most this often
+TIMELINE_FLUSH_MS = 50  # Packets arriving within this window are drawn together
+
+# Turn timer label text by seconds left, built once
+_SECOND_STRS = tuple(f"{i}s" for i in range(TURN_SECONDS + 1))
+
+
+class Dirty(IntFlag):
+    """Host display sections that need refreshing, see HostWindow.update_display"""
+    SCORE = 1
+    TURN = 2
+    RWND = 4
+    ALL = SCORE | TURN | RWND
+
+
+class UIState(IntEnum):
+    """What the turn label and send/error buttons show, see HostWindow.update_turn"""
+    MY_TURN = 0
+    OPP_TURN = 1
+    DISCONNECTED = 2  # Host's turn but no Player B to send to
+    GAME_OVER = 3  # Result shown by end_game(); kept until a new game or reset_game()
 
 
-class HostWindow:
+class HostWindow(WindowBase):
     """Window for Player A (Host) - runs the game server"""
     
+    # Foreground colors for turn/timer labels
+    _COLOR_HOT = "#ff4444"
+    _COLOR_WARN = "#ffd93d"
+    _COLOR_OK = "#4ade80"
+    _COLOR_IDLE = "#888888"
+    _COLOR_TEXT = "#e0e0e0"
+    
+    # Turn timer color indexed by seconds left (0..TURN_SECONDS), on the host's turn / Player B's
+    _TIMER_COLOR_MY = (_COLOR_HOT,) * 11 + (_COLOR_WARN,) * 10 + (_COLOR_OK,) * (TURN_SECONDS - 20)
+    _TIMER_COLOR_OPP = (_COLOR_HOT,) * 11 + (_COLOR_WARN,) * 10 + (_COLOR_IDLE,) * (TURN_SECONDS - 20)
+    # Game timer color by band: <=30s, <=60s, more
+    _GAME_TIMER_BANDS = (_COLOR_HOT, _COLOR_WARN, _COLOR_TEXT)
+    
+    # Turn label text, its color and the send/error button state per UIState
+    _UI_STATES = {
+        UIState.MY_TURN: ("YOUR TURN!", _COLOR_OK, tk.NORMAL),
+        UIState.OPP_TURN: ("Waiting for Player B...", _COLOR_IDLE, tk.DISABLED),
+        UIState.DISCONNECTED: ("YOUR TURN!", _COLOR_OK, tk.DISABLED),
+    }
+    
     def __init__(self, root: tk.Tk, port: int = 5555):
-        self.root = root
+        super().__init__(root)
         self.root.title("TCP Game - Player A (Host)")
         self.root.geometry("520x650")
         self.root.minsize(450, 500)
@@ -37,17 +89,48 @@ class HostWindow:
         self.server.on_packet_received = self.on_remote_packet
         self.server.on_client_disconnected = self.on_client_disconnected
         self.server.on_error = self.on_network_error
-        
-        # Timer state
-        self.timer_id = None
-        self.rwnd_timer_id = None
-        self.game_timer_id = None
+        # Tk-side copy of server.connected, only changed by the connect/disconnect handlers
+        self._client_connected = False
+        
+        # Timer state - one tick serves all three countdowns, each kept as a
+        # time.monotonic() deadline (None = not running)
+        self.tick_id = None
+        self._tick_due = 0.0  # time.monotonic() at which tick_id fires
+        self.turn_deadline = None
+        self.game_deadline = None
+        self.rwnd_deadline = None
         self.time_left = 45  # Turn timer (45 seconds)
         self.game_time_left = 300  # Game timer (5 minutes = 300 seconds)
         self.game_over = False
+        self._timeout_id = None  # Pending _timeout_finalize()
+        self._timeout_message = ""
+        
+        self._dirty = Dirty(0)  # Display sections awaiting update_display()
+        self._ui_state = None  # UIState last applied by update_turn()
+        self._turn_commit_id = None  # Pending _commit_turn()
+        
+        # Newest log lines; the log label is redrawn from this, see _flush_log()
+        self._log_ring = deque(maxlen=LOG_MAX_LINES)
+        self._log_flush_id = None
+        
+        # Packets waiting to be drawn by _flush_timeline()
+        self._pending_timeline = []
+        self._timeline_flush_id = None
+        
+        # State update waiting for _flush_update(), and what was last sent
+        self._pending_update = None  # (message, is_valid, reset_timer)
+        self._update_flush_id = None
+        self._last_sent_key = None
+        self._full_sent_count = None  # history_count at the last full update
+        
+        # Built updates are encoded and sent by _send_loop() so a slow client
+        # never blocks the Tk thread; holds at most one (the newest) update
+        self._send_q = queue.Queue(maxsize=1)
+        self._sender = threading.Thread(target=self._send_loop, daemon=True)
+        self._sender.start()
         
         # Build UI
-        self.setup_styles()
+        configure_styles(self.root)
         self.create_widgets()
         self.update_display()
         
@@ -57,30 +140,17 @@ class HostWindow:
         # Handle window close
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
     
-    def setup_styles(self):
-        """Configure ttk styles for dark theme"""
-        style = ttk.Style()
-        style.theme_use('clam')
-        
-        style.configure("Dark.TFrame", background="#0f0f1a")
-        style.configure("Dark.TLabel", background="#0f0f1a", foreground="#e0e0e0", font=("Segoe UI", 11))
-        style.configure("Title.TLabel", background="#0f0f1a", foreground="#00d4ff", font=("Segoe UI", 16, "bold"))
-        style.configure("Score.TLabel", background="#1a1a2e", foreground="#4ade80", font=("Consolas", 14, "bold"))
-        style.configure("Turn.TLabel", background="#1a1a2e", foreground="#ffd93d", font=("Segoe UI", 14, "bold"))
-        style.configure("Timer.TLabel", background="#1a1a2e", foreground="#ff6b6b", font=("Consolas", 18, "bold"))
-        style.configure("Status.TLabel", background="#0f0f1a", foreground="#4ade80", font=("Consolas", 10))
-        style.configure("Error.TLabel", background="#0f0f1a", foreground="#ff4444", font=("Consolas", 10))
-        style.configure("RWND.TLabel", background="#1a1a2e", foreground="#a78bfa", font=("Consolas", 12, "bold"))
-        style.configure("Network.TLabel", background="#1a1a2e", foreground="#fbbf24", font=("Consolas", 10))
-    
     def create_widgets(self):
         """Create all GUI widgets"""
+        # Tk solves pack geometry lazily at idle time, so the packs below
+        # cost a single layout pass on first display - no forced update needed
+        
         # Main container - simple pack layout
         main_frame = ttk.Frame(self.root, style="Dark.TFrame")
         main_frame.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
         
         # Title
-        title_label = ttk.Label(main_frame, text="Player A (Host)", style="Title.TLabel")
+        title_label = ttk.Label(main_frame, text="Player A (Host)", style="Title.A.TLabel")
         title_label.pack(pady=(0, 3))
         
         # Network status panel
@@ -107,6 +177,9 @@ class HostWindow:
         # Turn timer (45s countdown)
         self.timer_label = ttk.Label(score_row, text="45s", style="Timer.TLabel")
         self.timer_label.pack(side=tk.RIGHT, padx=3)
+        # Its text changes on every update_timer(), so it bypasses _set()
+        self._timer_configure = self.timer_label.configure
+        self._last_timer_color = None
         
         # Game timer (5:00 countdown)
         self.game_timer_label = ttk.Label(score_row, text="5:00", style="Dark.TLabel")
@@ -130,7 +203,7 @@ class HostWindow:
         input_frame = tk.Frame(main_frame, bg="#1a1a2e", relief=tk.RIDGE, bd=1)
         input_frame.pack(fill=tk.X, pady=3)
         
-        ttk.Label(input_frame, text="Send Packet", style="Title.TLabel").pack(pady=3)
+        ttk.Label(input_frame, text="Send Packet", style="Title.A.TLabel").pack(pady=3)
         
         # Input fields - use grid for more compact layout
         fields_frame = tk.Frame(input_frame, bg="#1a1a2e")
@@ -141,28 +214,37 @@ class HostWindow:
         row1.pack(fill=tk.X, pady=1)
         
         ttk.Label(row1, text="SEQ:", style="Dark.TLabel", width=5).pack(side=tk.LEFT)
-        self.seq_entry = tk.Entry(row1, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
+        self.seq_var = tk.StringVar(value="0")
+        self.seq_entry = tk.Entry(row1, textvariable=self.seq_var, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
         self.seq_entry.pack(side=tk.LEFT, padx=2)
-        self.seq_entry.insert(0, "0")
         
         ttk.Label(row1, text="ACK:", style="Dark.TLabel", width=5).pack(side=tk.LEFT, padx=(8, 0))
-        self.ack_entry = tk.Entry(row1, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
+        self.ack_var = tk.StringVar(value="0")
+        self.ack_entry = tk.Entry(row1, textvariable=self.ack_var, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
         self.ack_entry.pack(side=tk.LEFT, padx=2)
-        self.ack_entry.insert(0, "0")
         
         # Row 2: LEN and RWND
         row2 = tk.Frame(fields_frame, bg="#1a1a2e")
         row2.pack(fill=tk.X, pady=1)
         
         ttk.Label(row2, text="LEN:", style="Dark.TLabel", width=5).pack(side=tk.LEFT)
-        self.len_entry = tk.Entry(row2, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
+        self.len_var = tk.StringVar(value="10")
+        self.len_entry = tk.Entry(row2, textvariable=self.len_var, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
         self.len_entry.pack(side=tk.LEFT, padx=2)
-        self.len_entry.insert(0, "10")
         
         ttk.Label(row2, text="RWND:", style="Dark.TLabel", width=6).pack(side=tk.LEFT, padx=(8, 0))
-        self.rwnd_entry = tk.Entry(row2, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
+        self.rwnd_var = tk.StringVar(value="50")
+        self.rwnd_entry = tk.Entry(row2, textvariable=self.rwnd_var, font=("Consolas", 10), width=8, bg="#2a2a3e", fg="white", insertbackground="white")
         self.rwnd_entry.pack(side=tk.LEFT, padx=2)
-        self.rwnd_entry.insert(0, "50")
+        
+        # Parsed entry values, kept current on every edit by _parse_entry()
+        self._entries = {"seq": self.seq_entry, "ack": self.ack_entry, "len": self.len_entry, "rwnd": self.rwnd_entry}
+        self._entry_vars = {"seq": self.seq_var, "ack": self.ack_var, "len": self.len_var, "rwnd": self.rwnd_var}
+        self._entry_ints = {}
+        self._entry_border = (self.seq_entry.cget("highlightbackground"), self.seq_entry.cget("highlightcolor"))
+        for name, var in self._entry_vars.items():
+            var.trace_add("write", lambda *_, name=name: self._parse_entry(name))
+            self._parse_entry(name)
         
         # Buttons
         btn_frame = tk.Frame(input_frame, bg="#1a1a2e")
@@ -199,11 +281,14 @@ class HostWindow:
         log_frame = tk.Frame(main_frame, bg="#1a1a2e", relief=tk.RIDGE, bd=1)
         log_frame.pack(fill=tk.X, pady=3)
         
-        self.log_text = tk.Text(
-            log_frame, height=3, bg="#0f0f1a", fg="#e0e0e0",
-            font=("Consolas", 8), state=tk.DISABLED
+        self._log_var = tk.StringVar(value="")
+        self._log_set = self._log_var.set
+        self.log_label = tk.Label(
+            log_frame, textvariable=self._log_var, height=LOG_MAX_LINES,
+            bg="#0f0f1a", fg="#e0e0e0", font=("Consolas", 8),
+            justify=tk.LEFT, anchor="nw"
         )
-        self.log_text.pack(fill=tk.X, padx=3, pady=3)
+        self.log_label.pack(fill=tk.X, padx=3, pady=3)
         
         # Reset button
         reset_btn = tk.Button(
@@ -214,66 +299,142 @@ class HostWindow:
     
     def start_server(self):
         """Start the socket server"""
+        # State updates are small and latency-sensitive, see send_update()
+        self.server.set_tcp_nodelay(True)
         if self.server.start():
             ip = self.server.get_local_ip()
-            self.network_label.configure(text=f"Listening on {ip}:{self.server.port}")
+            self._set(self.network_label, "network", text=f"Listening on {ip}:{self.server.port}")
             self.log_message(f"Server started on {ip}:{self.server.port}")
         else:
-            self.network_label.configure(text="Failed to start server")
+            self._set(self.network_label, "network", text="Failed to start server")
     
     def send_update(self, message: str, is_valid: bool, reset_timer: bool = True):
-        """Send state update to client including game timer info"""
-        if self.server.connected:
-            self.server.send_state_update(
-                self.game_state, message, is_valid, reset_timer,
+        """
+        Queue a state update to the client including game timer info.
+        All updates queued in one mainloop pass go out as a single send
+        (latest message wins, reset_timer if any of them asked for it).
+        The server has TCP_NODELAY set (see start_server) so that send is
+        not held back by Nagle's algorithm waiting for the client's ACK.
+        """
+        if self._pending_update is not None:
+            reset_timer = reset_timer or self._pending_update[2]
+        self._pending_update = (message, is_valid, reset_timer)
+        if self._update_flush_id is None:
+            self._update_flush_id = self.root.after_idle(self._flush_update)
+    
+    def _flush_update(self):
+        """Send the pending state update, unless it matches the last one sent"""
+        self._update_flush_id = None
+        message, is_valid, reset_timer = self._pending_update
+        self._pending_update = None
+        if not self._client_connected:
+            return
+        
+        gs = self.game_state
+        key = (
+            gs.score_a, gs.score_b, gs.current_turn, gs.player_a.rwnd, gs.player_b.rwnd,
+            gs.player_a.next_seq, gs.player_b.next_seq, gs.history_count,
+            self.game_time_left, self.game_over, message, is_valid, reset_timer,
+        )
+        if key == self._last_sent_key:
+            return
+        self._last_sent_key = key
+        
+        # Snapshot on the Tk thread; the sender thread never touches game_state.
+        # With no new packets since the last full update (e.g. the rwnd tick)
+        # the client already has the history, so only the numbers go out -
+        # unless this replaces a full update the sender hasn't picked up yet.
+        unsent = self._take_unsent()
+        if (message in STATE_NUM_MESSAGES and gs.history_count == self._full_sent_count
+                and not isinstance(unsent, StateUpdate)):
+            update = build_state_num(
+                gs, message, is_valid, reset_timer,
                 game_time_left=self.game_time_left,
                 game_over=self.game_over
             )
+        else:
+            # The client has every packet before the last full update it was
+            # sent (or that one's start, if it is the one being replaced)
+            history_from = unsent.history_start if isinstance(unsent, StateUpdate) else self._full_sent_count
+            self._full_sent_count = gs.history_count
+            update = build_state_update(
+                gs, message, is_valid, reset_timer,
+                game_time_left=self.game_time_left,
+                game_over=self.game_over,
+                history_from=history_from
+            )
+        self._send_q.put_nowait(update)
+    
+    def _take_unsent(self):
+        """Remove and return the update the sender thread has not picked up yet (or None)"""
+        try:
+            return self._send_q.get_nowait()
+        except queue.Empty:
+            return None
+    
+    def _queue_send(self, update):
+        """Hand update to the sender thread, replacing one it has not picked up yet"""
+        self._take_unsent()
+        # Only the Tk thread puts, so the queue has room here
+        self._send_q.put_nowait(update)
+    
+    def _send_loop(self):
+        """Sender thread: encode and send queued updates until None arrives"""
+        while True:
+            update = self._send_q.get()
+            if update is None:
+                break
+            self.server.send_state(update)
+    
+    def _add_to_timeline(self, packet_info: dict):
+        """Queue a packet for the timeline; a burst is drawn in one add_packets() call"""
+        self._pending_timeline.append(packet_info)
+        if self._timeline_flush_id is None:
+            self._timeline_flush_id = self._after(TIMELINE_FLUSH_MS, self._flush_timeline)
+    
+    def _flush_timeline(self):
+        """Draw all queued packets"""
+        self._timeline_flush_id = None
+        pending, self._pending_timeline = self._pending_timeline, []
+        self.timeline.add_packets(pending)
+    
+    def _clear_timeline(self):
+        """Clear the timeline, dropping packets not drawn yet"""
+        self._pending_timeline.clear()
+        self.timeline.clear()
     
     def on_client_connected(self, addr):
         """Called when client connects"""
-        self.root.after(0, lambda: self._handle_client_connected(addr))
+        self._post(self._handle_client_connected, addr)
     
     def _handle_client_connected(self, addr):
         """Handle client connection on main thread - resets game state"""
-        self.network_label.configure(text=f"✅ Player B connected from {addr[0]}")
+        self._client_connected = True
+        self._set(self.network_label, "network", text=f"✅ Player B connected from {addr[0]}")
         self.log_message(f"Player B connected from {addr}")
         
-        # Reset game state for new game
+        # Reset game state for new game (and always send the first update)
+        self._last_sent_key = None
+        self._full_sent_count = None
         self.game_state.reset()
         self.game_state.player_a.rwnd = 50
         self.game_state.player_b.rwnd = 50
         
         # Clear timeline
-        self.timeline.clear()
+        self._clear_timeline()
         
         # Reset input fields
-        self.seq_entry.delete(0, tk.END)
-        self.seq_entry.insert(0, "0")
-        self.ack_entry.delete(0, tk.END)
-        self.ack_entry.insert(0, "0")
-        self.len_entry.delete(0, tk.END)
-        self.len_entry.insert(0, "10")
-        self.rwnd_entry.delete(0, tk.END)
-        self.rwnd_entry.insert(0, "50")
-        
-        self.status_label.configure(text="Game started! (State reset)", style="Status.TLabel")
-        
-        # Enable buttons for Player A's turn
-        self.send_btn.configure(state=tk.NORMAL)
-        self.error_btn.configure(state=tk.NORMAL)
-        
-        # Cancel old timers if exists
-        if self.rwnd_timer_id:
-            self.root.after_cancel(self.rwnd_timer_id)
-            self.rwnd_timer_id = None
-        if self.game_timer_id:
-            self.root.after_cancel(self.game_timer_id)
-            self.game_timer_id = None
+        self._set_entry("seq", "0")
+        self._set_entry("ack", "0")
+        self._set_entry("len", "10")
+        self._set_entry("rwnd", "50")
+        
+        self._set(self.status_label, "status", text="Game started! (State reset)", style="Status.TLabel")
         
         # Reset game state
         self.game_over = False
         self.game_time_left = 300  # 5 minutes
+        self._ui_state = None  # Replace a shown result
         
         # Start timers
         self.start_timer()
@@ -289,7 +450,7 @@ class HostWindow:
     
     def on_remote_packet(self, seq: int, ack: int, length: int, rwnd: int, is_error: bool):
         """Called when packet received from Player B"""
-        self.root.after(0, lambda: self._handle_remote_packet(seq, ack, length, rwnd, is_error))
+        self._post(self._handle_remote_packet, seq, ack, length, rwnd, is_error)
     
     def _handle_remote_packet(self, seq: int, ack: int, length: int, rwnd: int, is_error: bool):
         """Handle remote packet on main thread"""
@@ -298,12 +459,10 @@ class HostWindow:
             return
         
         # Process packet through game state
-        is_valid, message, _, _ = self.game_state.process_packet(seq, ack, length, rwnd, is_error=is_error)
+        is_valid, message, _, _, packet_info = self.game_state.process_packet(seq, ack, length, rwnd, is_error=is_error)
         
         # Add to timeline
-        if self.game_state.packet_history:
-            packet_info = self.game_state.packet_history[-1]
-            self.timeline.add_packet(packet_info)
+        self._add_to_timeline(packet_info)
         
         # Update RWND if valid
         if is_valid and not is_error:
@@ -313,246 +472,356 @@ class HostWindow:
         if is_error:
             self.log_message(f"📥 B sent ERROR: {message}")
         else:
-            packet_str = f"seq={seq} ack={ack} len={length} rwnd={rwnd}"
             if is_valid:
-                self.log_message(f"📥 B: {packet_str}: ✓ VALID")
+                self.log_message(f"📥 B: seq={seq} ack={ack} len={length} rwnd={rwnd}: ✓ VALID")
             else:
-                self.log_message(f"📥 B: {packet_str}: ✗ {message}", is_error=True)
+                self.log_message(f"📥 B: seq={seq} ack={ack} len={length} rwnd={rwnd}: ✗ {message}", is_error=True)
         
-        # Update display
-        self.update_display()
-        self.start_timer()
-        
-        # Send state update to client
+        self._queue_turn_commit(message, is_valid)
+    
+    def _queue_turn_commit(self, message: str, is_valid: bool, dirty: Dirty = Dirty.ALL):
+        """
+        Finish a turn: queue the state update and mark dirty for one idle
+        _commit_turn, so packets arriving back-to-back share one redraw,
+        timer restart and send.
+        """
+        self._dirty |= dirty
         self.send_update(message, is_valid)
+        if self._turn_commit_id is None:
+            self._turn_commit_id = self.root.after_idle(self._commit_turn)
+    
+    def _commit_turn(self):
+        """Redraw the dirty sections and restart the turn timer for the turn(s) just played"""
+        self._turn_commit_id = None
+        self.update_display(Dirty(0))
+        if not self.game_over:
+            self.start_timer()
     
     def on_client_disconnected(self):
         """Called when client disconnects"""
-        self.root.after(0, self._handle_client_disconnected)
+        self._post(self._handle_client_disconnected)
     
     def _handle_client_disconnected(self):
         """Handle client disconnect on main thread"""
-        self.network_label.configure(text="❌ Player B disconnected")
+        self._client_connected = False
+        self._set(self.network_label, "network", text="❌ Player B disconnected")
         self.log_message("Player B disconnected", is_error=True)
-        self.send_btn.configure(state=tk.DISABLED)
-        self.error_btn.configure(state=tk.DISABLED)
+        self.update_turn()
         self.stop_timer()
     
     def on_network_error(self, error: str):
         """Called on network error"""
-        self.root.after(0, lambda: self.log_message(f"Network error: {error}", is_error=True))
+        self._post(self._handle_network_error, error)
+    
+    def _handle_network_error(self, error: str):
+        """Handle network error on main thread"""
+        self.log_message(f"Network error: {error}", is_error=True)
     
     def send_packet(self):
         """Send a packet (local Player A)"""
         if self.game_state.current_turn != Player.A:
-            self.status_label.configure(text="Not your turn!", style="Error.TLabel")
+            self._set(self.status_label, "status", text="Not your turn!", style="Error.TLabel")
             return
         
-        if not self.server.connected:
-            self.status_label.configure(text="Player B not connected!", style="Error.TLabel")
+        if not self._client_connected:
+            self._set(self.status_label, "status", text="Player B not connected!", style="Error.TLabel")
             return
         
-        try:
-            seq = int(self.seq_entry.get())
-            ack = int(self.ack_entry.get())
-            length = int(self.len_entry.get())
-            rwnd = int(self.rwnd_entry.get()) if self.rwnd_entry.get().strip() else self.game_state.player_a.rwnd
-        except ValueError:
-            self.status_label.configure(text="Invalid input - use integers", style="Error.TLabel")
+        seq, ack, length, rwnd = (self._entry_ints[name] for name in ("seq", "ack", "len", "rwnd"))
+        if rwnd is None and not self.rwnd_var.get().strip():
+            rwnd = self.game_state.player_a.rwnd
+        if None in (seq, ack, length, rwnd):
+            self._set(self.status_label, "status", text="Invalid input - use integers", style="Error.TLabel")
+            # Put the cursor in the first offending entry (already outlined red)
+            name = ("seq", "ack", "len", "rwnd")[(seq, ack, length, rwnd).index(None)]
+            self._entries[name].focus_set()
             return
         
         # Process packet
-        is_valid, message, _, _ = self.game_state.process_packet(seq, ack, length, rwnd, is_error=False)
+        is_valid, message, _, _, packet_info = self.game_state.process_packet(seq, ack, length, rwnd, is_error=False)
         
         # Add to timeline
-        if self.game_state.packet_history:
-            packet_info = self.game_state.packet_history[-1]
-            self.timeline.add_packet(packet_info)
+        self._add_to_timeline(packet_info)
         
         # Log
-        packet_str = f"seq={seq} ack={ack} len={length} rwnd={rwnd}"
         if is_valid:
-            self.log_message(f"📤 {packet_str}: ✓ VALID")
-            self.status_label.configure(text=message, style="Status.TLabel")
+            self.log_message(f"📤 seq={seq} ack={ack} len={length} rwnd={rwnd}: ✓ VALID")
+            self._set(self.status_label, "status", text=message, style="Status.TLabel")
             # Update opponent's rwnd
             self.game_state.player_b.rwnd = max(0, self.game_state.player_b.rwnd - length)
         else:
-            self.log_message(f"📤 {packet_str}: ✗ {message}", is_error=True)
-            self.status_label.configure(text=message, style="Error.TLabel")
+            self.log_message(f"📤 seq={seq} ack={ack} len={length} rwnd={rwnd}: ✗ {message}", is_error=True)
+            self._set(self.status_label, "status", text=message, style="Error.TLabel")
         
-        self.update_display()
-        self.start_timer()
         self.update_suggested_values()
-        
-        # Send state update to client
-        self.send_update(message, is_valid)
+        self._queue_turn_commit(message, is_valid)
     
     def send_error(self):
         """Send ERROR packet"""
         if self.game_state.current_turn != Player.A:
-            self.status_label.configure(text="Not your turn!", style="Error.TLabel")
+            self._set(self.status_label, "status", text="Not your turn!", style="Error.TLabel")
             return
         
-        if not self.server.connected:
-            self.status_label.configure(text="Player B not connected!", style="Error.TLabel")
+        if not self._client_connected:
+            self._set(self.status_label, "status", text="Player B not connected!", style="Error.TLabel")
             return
         
-        is_valid, message, _, _ = self.game_state.process_packet(0, 0, 0, 0, is_error=True)
+        is_valid, message, _, _, packet_info = self.game_state.process_packet(0, 0, 0, 0, is_error=True)
         
         # Add to timeline
-        if self.game_state.packet_history:
-            packet_info = self.game_state.packet_history[-1]
-            self.timeline.add_packet(packet_info)
+        self._add_to_timeline(packet_info)
         
         if is_valid:
             self.log_message(f"⚠️ ERROR: {message}")
-            self.status_label.configure(text=message, style="Status.TLabel")
+            self._set(self.status_label, "status", text=message, style="Status.TLabel")
         else:
             self.log_message(f"⚠️ ERROR: {message}", is_error=True)
-            self.status_label.configure(text=message, style="Error.TLabel")
-        
-        self.update_display()
-        self.start_timer()
+            self._set(self.status_label, "status", text=message, style="Error.TLabel")
         
-        # Send state update to client
-        self.send_update(message, is_valid)
+        # ERROR packets only move scores and the turn
+        self._queue_turn_commit(message, is_valid, Dirty.SCORE | Dirty.TURN)
     
-    def update_display(self):
-        """Update all display elements"""
-        # Scores
-        self.score_a_label.configure(text=f"A: {self.game_state.score_a}")
-        self.score_b_label.configure(text=f"B: {self.game_state.score_b}")
-        
-        # Turn indicator
-        is_my_turn = self.game_state.current_turn == Player.A
-        if is_my_turn:
-            self.turn_label.configure(text="YOUR TURN!", foreground="#4ade80")
-            if self.server.connected:
-                self.send_btn.configure(state=tk.NORMAL)
-                self.error_btn.configure(state=tk.NORMAL)
+    def update_display(self, dirty: Optional[Dirty] = None):
+        """Refresh the display sections flagged in dirty (default: all) plus any pending in self._dirty"""
+        dirty = (Dirty.ALL if dirty is None else dirty) | self._dirty
+        self._dirty = Dirty(0)
+        if dirty & Dirty.SCORE:
+            self.update_scores()
+        if dirty & Dirty.TURN:
+            self.update_turn()
+        if dirty & Dirty.RWND:
+            self.update_rwnds()
+    
+    def update_scores(self):
+        """Update score labels"""
+        gs, set_text = self.game_state, self._set_text
+        set_text(self.score_a_label, "score_a", "A: {}".format, gs.score_a)
+        set_text(self.score_b_label, "score_b", "B: {}".format, gs.score_b)
+    
+    def update_turn(self):
+        """Update turn indicator and send/error buttons (no-op unless the UIState changed)"""
+        # The result stays up (e.g. when Player B leaves) until a new game or reset
+        if self._ui_state == UIState.GAME_OVER:
+            return
+        if self.game_state.current_turn != Player.A:
+            state = UIState.OPP_TURN
+        elif self._client_connected:
+            state = UIState.MY_TURN
         else:
-            self.turn_label.configure(text="Waiting for Player B...", foreground="#888888")
-            self.send_btn.configure(state=tk.DISABLED)
-            self.error_btn.configure(state=tk.DISABLED)
+            state = UIState.DISCONNECTED
+        if state == self._ui_state:
+            return
+        self._ui_state = state
         
-        # RWND displays
-        self.my_rwnd_label.configure(text=f"My RWND: {self.game_state.player_a.rwnd}")
-        self.opp_rwnd_label.configure(text=f"Opp RWND: {self.game_state.player_b.rwnd}")
-        self.rwnd_entry.delete(0, tk.END)
-        self.rwnd_entry.insert(0, str(self.game_state.player_a.rwnd))
+        text, color, buttons = self._UI_STATES[state]
+        self._set(self.turn_label, "turn", text=text, foreground=color)
+        self._set_buttons(buttons)
+    
+    def update_rwnds(self):
+        """Update RWND labels and the RWND entry"""
+        # Host's perspective: me = A, opp = B
+        gs, set_text = self.game_state, self._set_text
+        my_rwnd = gs.player_a.rwnd
+        set_text(self.my_rwnd_label, "my_rwnd", "My RWND: {}".format, my_rwnd)
+        set_text(self.opp_rwnd_label, "opp_rwnd", "Opp RWND: {}".format, gs.player_b.rwnd)
+        self._set_entry("rwnd", str(my_rwnd), unless_focused=True)
+    
+    def _parse_entry(self, name: str):
+        """Cache an entry's integer value (None if invalid) and flag invalid input with a red border"""
+        text = self._entry_vars[name].get()
+        # Optional minus sign and ASCII digits only; checked up front instead
+        # of letting int() raise on every half-typed value
+        digits = text.strip()
+        if digits[:1] == "-":
+            digits = digits[1:]
+        value = None
+        if digits.isascii() and digits.isdigit():
+            try:
+                value = int(text)
+            except ValueError:  # Past the interpreter's int digit limit
+                pass
+        self._entry_ints[name] = value
+        
+        # An empty RWND is fine: send_packet falls back to the current window
+        invalid = value is None and (name != "rwnd" or text.strip())
+        background, color = (self._COLOR_HOT, self._COLOR_HOT) if invalid else self._entry_border
+        self._set(self._entries[name], f"{name}_entry", highlightbackground=background, highlightcolor=color)
+    
+    def _set_buttons(self, state: str):
+        """Set send and error buttons (always enabled/disabled together) to state"""
+        if self._last.get(("buttons", "state")) != state:
+            self._last[("buttons", "state")] = state
+            self.send_btn.configure(state=state)
+            self.error_btn.configure(state=state)
+    
+    def _set_entry(self, name: str, text: str, unless_focused: bool = False):
+        """
+        Set an entry's variable to text if it differs. With unless_focused,
+        leave it alone while it has keyboard focus, for updates that can
+        arrive while the user is typing (the rwnd tick).
+        """
+        var = self._entry_vars[name]
+        if var.get() == text:
+            return
+        # Compare Tcl path names: focus_get() raises KeyError while focus is in
+        # a widget tkinter didn't create (e.g. the X11 askyesno dialog)
+        if unless_focused and self.root.tk.call("focus") == str(self._entries[name]):
+            return
+        var.set(text)
     
     def update_suggested_values(self):
         """Update entry fields with suggested next values"""
-        self.seq_entry.delete(0, tk.END)
-        self.seq_entry.insert(0, str(self.game_state.player_a.next_seq))
-        
-        self.ack_entry.delete(0, tk.END)
-        self.ack_entry.insert(0, str(self.game_state.player_a.last_ack_received))
-        
-        self.len_entry.delete(0, tk.END)
-        self.len_entry.insert(0, "10")
+        self._set_entry("seq", str(self.game_state.player_a.next_seq))
+        self._set_entry("ack", str(self.game_state.player_a.last_ack_received))
+        self._set_entry("len", "10")
+    
+    def _ensure_tick(self):
+        """Make sure the shared timer tick fires in time for the deadlines as they are now"""
+        now = time.monotonic()
+        wait = self._next_wait(now)
+        if self.tick_id is not None:
+            # An earlier tick simply reschedules itself, so keep it rather
+            # than paying a cancel + after on every turn
+            if wait is not None and self._tick_due <= now + wait:
+                return
+            self.root.after_cancel(self.tick_id)
+            self.tick_id = None
+        self._schedule_tick(now, wait)
+    
+    def _schedule_tick(self, now: float, wait: Optional[float]):
+        """Arm the tick to fire in wait seconds (None: nothing is running)"""
+        if wait is not None:
+            delay_ms = max(1, math.ceil(wait * 1000))
+            self._tick_due = now + delay_ms / 1000
+            self.tick_id = self._after(delay_ms, self._tick)
+    
+    def _next_wait(self, now: float) -> Optional[float]:
+        """Seconds until the next countdown label change or rwnd increase, None if none is running"""
+        waits = []
+        for deadline in (self.game_deadline, self.turn_deadline):
+            if deadline is not None:
+                # The shown value is ceil(left); it drops once left passes ceil(left) - 1
+                left = deadline - now
+                waits.append(left - (math.ceil(left) - 1) if left > 0 else 0)
+        if self.rwnd_deadline is not None:
+            waits.append(self.rwnd_deadline - now)
+        return min(waits) if waits else None
+    
+    def _tick(self):
+        """Recompute running countdowns from their deadlines; sleeps until the next one changes"""
+        now = time.monotonic()
+        try:
+            # Game timer first so game end takes precedence over a same-second timeout
+            if self.game_deadline is not None:
+                remaining = max(0, math.ceil(self.game_deadline - now))
+                if remaining != self.game_time_left:
+                    self.game_time_left = remaining
+                    self.update_game_timer()
+            
+            if self.turn_deadline is not None:
+                remaining = max(0, math.ceil(self.turn_deadline - now))
+                if remaining != self.time_left:
+                    self.time_left = remaining
+                    self.update_timer()
+            
+            if self.rwnd_deadline is not None and now >= self.rwnd_deadline:
+                # A late tick (e.g. the window was blocked) catches up in one step
+                steps = int((now - self.rwnd_deadline) // RWND_INTERVAL) + 1
+                self.rwnd_deadline += steps * RWND_INTERVAL
+                self.increase_rwnd(steps)
+        finally:
+            # Re-arm even if a handler failed, or every countdown stops for good
+            self.tick_id = None
+            self._schedule_tick(now, self._next_wait(now))
     
     def start_timer(self):
         """Start the 45-second countdown timer"""
-        self.stop_timer()
-        self.time_left = 45
+        self.time_left = TURN_SECONDS
+        self.turn_deadline = time.monotonic() + TURN_SECONDS
         self.update_timer()
+        self._ensure_tick()
     
     def stop_timer(self):
         """Stop the timer"""
-        if self.timer_id is not None:
-            self.root.after_cancel(self.timer_id)
-            self.timer_id = None
+        self.turn_deadline = None
     
     def update_timer(self):
         """Update timer display - counts down for BOTH players"""
-        is_my_turn = self.game_state.current_turn == Player.A
-        
-        self.timer_label.configure(text=f"{self.time_left}s")
+        colors = self._TIMER_COLOR_MY if self.game_state.current_turn == Player.A else self._TIMER_COLOR_OPP
         
         # Timer always counts down (host tracks both players' timeouts)
-        if self.time_left <= 10:
-            self.timer_label.configure(foreground="#ff4444")
-        elif self.time_left <= 20:
-            self.timer_label.configure(foreground="#ffd93d")
+        color = colors[self.time_left]
+        if color != self._last_timer_color:
+            self._last_timer_color = color
+            self._timer_configure(text=_SECOND_STRS[self.time_left], foreground=color)
         else:
-            if is_my_turn:
-                self.timer_label.configure(foreground="#4ade80")
-            else:
-                self.timer_label.configure(foreground="#888888")
+            self._timer_configure(text=_SECOND_STRS[self.time_left])
         
         if self.time_left <= 0:
             self.handle_timeout()
-            return
-        
-        self.time_left -= 1
-        self.timer_id = self.root.after(1000, self.update_timer)
     
     def handle_timeout(self):
         """Handle 45-second timeout for current player"""
-        # Apply penalty to whoever's turn it is
-        message = self.game_state.apply_timeout_penalty()
+        # Apply penalty to whoever's turn it is; the rest waits for _timeout_finalize
+        self._timeout_message = self.game_state.apply_timeout_penalty()
+        self._dirty |= Dirty.SCORE
+        self.stop_timer()
+        if self._timeout_id is None:
+            self._timeout_id = self.root.after_idle(self._timeout_finalize)
+    
+    def _timeout_finalize(self):
+        """Log, redraw, send and rearm the turn timer for a timeout in one idle pass"""
+        self._timeout_id = None
+        if self.game_over:
+            return
+        message = self._timeout_message
         self.log_message(f"⏰ {message}", is_error=True)
-        self.update_display()
-        if self.server.connected:
+        self.update_display(Dirty(0))
+        if self._client_connected:
             self.send_update(message, False)
+            # Already idle, so send now rather than in yet another idle callback
+            self.root.after_cancel(self._update_flush_id)
+            self._flush_update()
         self.start_timer()
     
     def start_rwnd_timer(self):
-        """Start the rwnd increase timer"""
-        self.schedule_rwnd_increase()
+        """Start the rwnd increase countdown (+20 every 15 seconds)"""
+        self.rwnd_deadline = time.monotonic() + RWND_INTERVAL
+        self._ensure_tick()
     
-    def schedule_rwnd_increase(self):
-        """Schedule the next rwnd increase"""
-        self.rwnd_timer_id = self.root.after(15000, self.increase_rwnd)
-    
-    def increase_rwnd(self):
-        """Increase rwnd by 20 every 15 seconds"""
+    def increase_rwnd(self, steps: int = 1):
+        """Increase rwnd by 20 for each 15 seconds elapsed (steps)"""
         if self.game_over:
             return
-            
-        old_a = self.game_state.player_a.rwnd
-        old_b = self.game_state.player_b.rwnd
         
-        self.game_state.player_a.rwnd = old_a + 20
-        self.game_state.player_b.rwnd = old_b + 20
+        increase = 20 * steps
+        self.game_state.player_a.rwnd += increase
+        self.game_state.player_b.rwnd += increase
         
-        self.update_display()
-        self.log_message(f"Both RWND +20 (A:{self.game_state.player_a.rwnd}, B:{self.game_state.player_b.rwnd})")
+        self.update_display(Dirty.RWND)
+        self.log_message(f"Both RWND +{increase} (A:{self.game_state.player_a.rwnd}, B:{self.game_state.player_b.rwnd})")
         
         # Send update to client (don't reset their timer - RWND update is not a packet exchange)
-        self.send_update("RWND increased +20", True, reset_timer=False)
-        
-        self.schedule_rwnd_increase()
+        self.send_update(f"RWND increased +{increase}", True, reset_timer=False)
     
     def start_game_timer(self):
         """Start the 5-minute game timer"""
+        self.game_deadline = time.monotonic() + self.game_time_left
         self.update_game_timer()
+        self._ensure_tick()
     
     def update_game_timer(self):
-        """Update game timer display every second"""
+        """Update game timer display"""
         if self.game_over:
             return
         
-        # Update display (MM:SS format)
-        minutes = self.game_time_left // 60
-        seconds = self.game_time_left % 60
-        self.game_timer_label.configure(text=f"{minutes}:{seconds:02d}")
-        
-        # Color based on time left
-        if self.game_time_left <= 30:
-            self.game_timer_label.configure(foreground="#ff4444")
-        elif self.game_time_left <= 60:
-            self.game_timer_label.configure(foreground="#ffd93d")
-        else:
-            self.game_timer_label.configure(foreground="#e0e0e0")
+        # Update display (MM:SS format), colored by time left
+        minutes, seconds = divmod(self.game_time_left, 60)
+        color = self._GAME_TIMER_BANDS[(self.game_time_left > 30) + (self.game_time_left > 60)]
+        self._set(self.game_timer_label, "game_timer", text=f"{minutes}:{seconds:02d}", foreground=color)
         
         if self.game_time_left <= 0:
             self.end_game()
-            return
-        
-        self.game_time_left -= 1
-        self.game_timer_id = self.root.after(1000, self.update_game_timer)
     
     def end_game(self):
         """End the game after 5 minutes and determine winner"""
@@ -561,13 +830,12 @@ class HostWindow:
         
         # Stop all timers
         self.stop_timer()
-        if self.rwnd_timer_id:
-            self.root.after_cancel(self.rwnd_timer_id)
-            self.rwnd_timer_id = None
+        self.game_deadline = None
+        self.rwnd_deadline = None
         
-        # Disable buttons
-        self.send_btn.configure(state=tk.DISABLED)
-        self.error_btn.configure(state=tk.DISABLED)
+        # Disable buttons; the turn label shows the result
+        self._ui_state = UIState.GAME_OVER
+        self._set_buttons(tk.DISABLED)
         
         # Determine winner
         score_a = self.game_state.score_a
@@ -575,49 +843,52 @@ class HostWindow:
         
         if score_a > score_b:
             winner_msg = f"GAME OVER! Player A WINS! (A: {score_a}, B: {score_b})"
-            self.turn_label.configure(text="YOU WIN!", foreground="#4ade80")
+            self._set(self.turn_label, "turn", text="YOU WIN!", foreground=self._COLOR_OK)
         elif score_b > score_a:
             winner_msg = f"GAME OVER! Player B WINS! (A: {score_a}, B: {score_b})"
-            self.turn_label.configure(text="YOU LOSE!", foreground="#ff4444")
+            self._set(self.turn_label, "turn", text="YOU LOSE!", foreground=self._COLOR_HOT)
         else:
             winner_msg = f"GAME OVER! IT'S A TIE! (A: {score_a}, B: {score_b})"
-            self.turn_label.configure(text="TIE GAME!", foreground="#ffd93d")
+            self._set(self.turn_label, "turn", text="TIE GAME!", foreground=self._COLOR_WARN)
         
         self.log_message(f"GAME OVER - Final Score: A={score_a}, B={score_b}")
-        self.status_label.configure(text=winner_msg, style="Status.TLabel")
-        self.game_timer_label.configure(text="0:00", foreground="#ff4444")
+        self._set(self.status_label, "status", text=winner_msg, style="Status.TLabel")
+        self._set(self.game_timer_label, "game_timer", text="0:00", foreground=self._COLOR_HOT)
         
         # Notify client
         self.send_update(winner_msg, True)
     
     def log_message(self, message: str, is_error: bool = False):
-        """Add message to log"""
-        self.log_text.configure(state=tk.NORMAL)
-        timestamp = time.strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.log_text.see(tk.END)
-        self.log_text.configure(state=tk.DISABLED)
+        """Add message to log (shown by _flush_log within LOG_FLUSH_MS)"""
+        self._log_ring.append(f"[{self._timestamp()}] {message}")
+        if self._log_flush_id is None:
+            self._log_flush_id = self._after(LOG_FLUSH_MS, self._flush_log)
+    
+    def _flush_log(self):
+        """Show the buffered lines in the log label"""
+        self._log_flush_id = None
+        self._log_set("\n".join(self._log_ring))
     
     def reset_game(self):
         """Reset the game"""
+        from tkinter import messagebox  # Only needed here; keeps it off the startup path
+        
         if messagebox.askyesno("Reset", "Reset the game?"):
             self.game_state.reset()
+            self._full_sent_count = None  # History starts over, send it from the top
             self.game_state.player_a.rwnd = 50
             self.game_state.player_b.rwnd = 50
             
-            self.log_text.configure(state=tk.NORMAL)
-            self.log_text.delete(1.0, tk.END)
-            self.log_text.configure(state=tk.DISABLED)
+            self._log_ring.clear()
+            self._log_var.set("")
             
-            self.timeline.clear()
+            self._clear_timeline()
             
-            self.seq_entry.delete(0, tk.END)
-            self.seq_entry.insert(0, "0")
-            self.ack_entry.delete(0, tk.END)
-            self.ack_entry.insert(0, "0")
-            self.len_entry.delete(0, tk.END)
-            self.len_entry.insert(0, "10")
+            self._set_entry("seq", "0")
+            self._set_entry("ack", "0")
+            self._set_entry("len", "10")
             
+            self._ui_state = None  # Replace a shown result
             self.update_display()
             self.start_timer()
             self.log_message("🔄 Game Reset")
@@ -626,17 +897,28 @@ class HostWindow:
     
     def on_close(self):
         """Handle window close"""
-        self.stop_timer()
-        if self.rwnd_timer_id:
-            self.root.after_cancel(self.rwnd_timer_id)
+        # Keep late network events from scheduling work on the destroyed window
+        self._drain_pending = True
+        
+        for after_id in (self.tick_id, self._timeout_id, self._turn_commit_id, self._log_flush_id,
+                         self._timeline_flush_id, self._update_flush_id, self._drain_id):
+            if after_id is not None:
+                self.root.after_cancel(after_id)
+        self._queue_send(None)
         self.server.stop()
         self.root.destroy()
 
 
-def main(port: int = 5555):
-    """Entry point for host window"""
+def main(argv: Optional[List[str]] = None):
+    """Entry point for host window: tcp-game-host [port]"""
+    parser = argparse.ArgumentParser(description="TCP Game - Host (Player A)")
+    parser.add_argument("port", nargs="?", type=int, default=5555, help="port to listen on (default: 5555)")
+    args = parser.parse_args(argv)
+    
+    print(f"Starting TCP Game Host on port {args.port}...")
+    print("Share your IP address with Player B to connect.")
     root = tk.Tk()
-    app = HostWindow(root, port=port)
+    app = HostWindow(root, port=args.port)
     root.mainloop()
 
 
@@ -0,0 +1,39 @@
+"""
+ttk Styles for TCP Game
+Dark theme shared by the host and client windows
+"""
+import tkinter as tk
+from tkinter import ttk
+import weakref
+
+# (style name, options); the title color tells the players apart
+STYLES = (
+    ("Dark.TFrame", {"background": "#0f0f1a"}),
+    ("Dark.TLabel", {"background": "#0f0f1a", "foreground": "#e0e0e0", "font": ("Segoe UI", 11)}),
+    ("Title.A.TLabel", {"background": "#0f0f1a", "foreground": "#00d4ff", "font": ("Segoe UI", 16, "bold")}),
+    ("Title.B.TLabel", {"background": "#0f0f1a", "foreground": "#ff6b6b", "font": ("Segoe UI", 16, "bold")}),
+    ("Score.TLabel", {"background": "#1a1a2e", "foreground": "#4ade80", "font": ("Consolas", 14, "bold")}),
+    ("Turn.TLabel", {"background": "#1a1a2e", "foreground": "#ffd93d", "font": ("Segoe UI", 14, "bold")}),
+    ("Timer.TLabel", {"background": "#1a1a2e", "foreground": "#ff6b6b", "font": ("Consolas", 18, "bold")}),
+    ("Status.TLabel", {"background": "#0f0f1a", "foreground": "#4ade80", "font": ("Consolas", 10)}),
+    ("Error.TLabel", {"background": "#0f0f1a", "foreground": "#ff4444", "font": ("Consolas", 10)}),
+    ("RWND.TLabel", {"background": "#1a1a2e", "foreground": "#a78bfa", "font": ("Consolas", 12, "bold")}),
+    ("Network.TLabel", {"background": "#1a1a2e", "foreground": "#fbbf24", "font": ("Consolas", 10)}),
+)
+
+# Tk roots whose ttk styles are already set up; styles live in the Tcl
+# interpreter, so a new root (e.g. after the old one was destroyed) needs them again
+_styled_roots = weakref.WeakSet()
+
+
+def configure_styles(root: tk.Tk):
+    """Apply the dark theme styles to root's interpreter (once per root)"""
+    if root in _styled_roots:
+        return
+    _styled_roots.add(root)
+    
+    style = ttk.Style(root)
+    style.theme_use('clam')
+    
+    for name, options in STYLES:
+        style.configure(name, **options)
@@ -5,12 +5,27 @@ With scrollbar support and centered layout
 """
 import tkinter as tk
 from tkinter import Canvas
-from typing import List, Dict
+from tkinter import font as tkfont
+from collections import deque
+from typing import Dict, Sequence, Tuple
+
+
+class _Defaulting(dict):
+    """Packet fields for the label format; a missing field shows as 0"""
+    
+    def __missing__(self, key):
+        return 0
+
+
+# Packet label, formatted in one call instead of four .get()s plus an f-string
+_LABEL_FMT = "s={seq} a={ack} l={len} r={rwnd}".format_map
 
 
 class TimelineCanvas(tk.Frame):
     """Canvas showing packet flow between two clients like TCP diagrams - with scrolling"""
     
+    MAX_VISIBLE = 64  # Newest packets kept on the canvas; older arrows are recycled
+    
     def __init__(self, parent, **kwargs):
         # Extract height if provided
         canvas_height = kwargs.pop('height', 250)
@@ -39,25 +54,58 @@ class TimelineCanvas(tk.Frame):
         self.packet_spacing = 45
         self.current_y = self.start_y
         
-        # Packet history for redraw
-        self.packets: List[Dict] = []
+        # Newest packets as _packet_view() tuples, for redraw on resize
+        self.packets = deque(maxlen=self.MAX_VISIBLE)
         
         # Scrolling support
         self.packet_count = 0
+        self._scroll_id = None  # Pending _apply_scroll(), see add_packets()
+        self._resize_id = None  # Pending _apply_resize(), see _on_resize()
+        self._size = (0, 0)  # Newest (width, height) from <Configure>; stands in for winfo_width/height
+        self._scroll_region = None  # Last scrollregion set, see _update_scroll_region()
         
-        # Bind mousewheel scrolling
-        self.canvas.bind("<MouseWheel>", self._on_mousewheel)
+        # Every canvas item is created once here and only moved/recolored
+        # afterwards, so a long game doesn't pile up items
+        self.header_a = self.canvas.create_text(0, 0, text="A", fill="#00d4ff", font=("Consolas", 12, "bold"))
+        self.header_b = self.canvas.create_text(0, 0, text="B", fill="#ff6b6b", font=("Consolas", 12, "bold"))
+        self.line_a = self.canvas.create_line(0, 0, 0, 0, fill="#00d4ff", width=2, dash=(4, 2))
+        self.line_b = self.canvas.create_line(0, 0, 0, 0, fill="#ff6b6b", width=2, dash=(4, 2))
+        # Per slot: arrow, packet label, invalid mark; packet n uses slot n % MAX_VISIBLE.
+        # The slots share two named fonts, resolved and measured once by Tk
+        self._label_font = tkfont.Font(root=self.canvas, family="Consolas", size=8)
+        self._mark_font = tkfont.Font(root=self.canvas, family="Consolas", size=8, weight="bold")
+        self._slots = [
+            (
+                self.canvas.create_line(0, 0, 0, 0, width=2, arrow=tk.LAST, state=tk.HIDDEN),
+                self.canvas.create_text(0, 0, font=self._label_font, anchor=tk.CENTER, state=tk.HIDDEN),
+                self.canvas.create_text(0, 0, text="✗", fill="#ff4444", font=self._mark_font, state=tk.HIDDEN),
+            )
+            for _ in range(self.MAX_VISIBLE)
+        ]
+        
+        # Bind mousewheel scrolling as a plain Tcl script (no Python callback
+        # per wheel event); int() truncates like the old int(-delta / 120)
+        self.canvas.tk.call(
+            "bind", str(self.canvas), "<MouseWheel>",
+            "%W yview scroll [expr {int(-(%D) / 120.0)}] units"
+        )
         self.canvas.bind("<Enter>", lambda e: self.canvas.focus_set())
         
         # Bind resize to recenter
         self.canvas.bind("<Configure>", self._on_resize)
         
-        # Initial draw will happen on first resize
-        self._last_width = 0
+        # Lane x positions everything is drawn against; only _on_resize changes them
+        self._lane_bottom = 0  # Canvas y the lanes currently reach, see draw_vertical_lines()
+        self._lanes = self._centered_positions(0)
+        self.draw_headers()
+        self.draw_vertical_lines()
     
     def _get_centered_positions(self):
-        """Calculate centered x positions for A and B lines"""
-        canvas_width = self.canvas.winfo_width()
+        """Current x positions of the A and B lines"""
+        return self._lanes
+    
+    def _centered_positions(self, canvas_width: int):
+        """Calculate centered x positions for A and B lines on a canvas canvas_width wide"""
         if canvas_width < 100:
             canvas_width = 450  # Default fallback
         
@@ -71,138 +119,180 @@ class TimelineCanvas(tk.Frame):
         return left_x, right_x
     
     def _on_resize(self, event):
-        """Handle canvas resize - recenter content"""
-        if event.width != self._last_width and event.width > 50:
-            self._last_width = event.width
-            self._redraw_all()
+        """Handle canvas resize - recenter content once the <Configure> burst is over"""
+        self._size = (event.width, event.height)
+        if self._resize_id is None:
+            self._resize_id = self.after_idle(self._apply_resize)
+    
+    def _apply_resize(self):
+        """Recenter content for the newest canvas size"""
+        self._resize_id = None
+        width, height = self._size
+        if width <= 50:
+            return
+        
+        # Most size changes (e.g. a window manager resize storm) leave the
+        # centered lanes where they are and the view within their length
+        lanes = self._centered_positions(width)
+        if lanes == self._lanes and self._top() + height <= self._lane_bottom:
+            return
+        
+        # Everything hangs off the lanes, so one move shifts it all (hidden
+        # slots too - they get absolute coords when next used)
+        if lanes != self._lanes:
+            self.canvas.move("all", lanes[0] - self._lanes[0], 0)
+            self._lanes = lanes
+        
+        # Lanes reach at least the bottom of the (possibly taller) view
+        self.draw_vertical_lines()
+        self._update_scroll_region()
     
-    def _on_mousewheel(self, event):
-        """Handle mousewheel scrolling"""
-        self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+    def _top(self) -> int:
+        """Canvas y of the diagram top: shifted down past packets no longer kept"""
+        return (self.packet_count - len(self.packets)) * self.packet_spacing
     
     def _redraw_all(self):
-        """Redraw everything centered"""
-        self.canvas.delete("all")
-        self.current_y = self.start_y
+        """Reposition everything centered"""
+        self.current_y = self.start_y + self.packet_count * self.packet_spacing
         
         self.draw_headers()
         self.draw_vertical_lines()
         
-        # Redraw all packets
-        for packet_info in self.packets:
-            self._draw_packet(packet_info)
+        # Redraw kept packets, hide the rest of the slots
+        arrows = self._arrow_xs(*self._get_centered_positions())
+        first = self.packet_count - len(self.packets)
+        for index, view in enumerate(self.packets, first):
+            self._draw_packet(view, index, arrows)
+        for index in range(len(self.packets), self.MAX_VISIBLE):
+            for item in self._slots[(first + index) % self.MAX_VISIBLE]:
+                self.canvas.itemconfigure(item, state=tk.HIDDEN)
         
         # Update scroll region
         self._update_scroll_region()
     
     def draw_headers(self):
-        """Draw Player A and Player B headers"""
+        """Place the Player A and Player B headers above the oldest kept packet"""
         left_x, right_x = self._get_centered_positions()
+        top = self._top()
         
-        self.canvas.create_text(
-            left_x, 20,
-            text="A",
-            fill="#00d4ff",
-            font=("Consolas", 12, "bold")
-        )
-        self.canvas.create_text(
-            right_x, 20,
-            text="B", 
-            fill="#ff6b6b",
-            font=("Consolas", 12, "bold")
-        )
+        self.canvas.coords(self.header_a, left_x, top + 20)
+        self.canvas.coords(self.header_b, right_x, top + 20)
     
     def draw_vertical_lines(self):
-        """Draw timeline vertical lines for both players"""
+        """Place the timeline vertical lines for both players"""
         left_x, right_x = self._get_centered_positions()
+        top = self._top()
+        # Just past the last packet (or the visible area); dashes are drawn over the whole length
+        bottom = max(self.current_y + 50, top + self._size[1])
+        self._lane_bottom = bottom
         
-        self.line_a = self.canvas.create_line(
-            left_x, 35, left_x, 5000,
-            fill="#00d4ff", width=2, dash=(4, 2)
-        )
-        self.line_b = self.canvas.create_line(
-            right_x, 35, right_x, 5000,
-            fill="#ff6b6b", width=2, dash=(4, 2)
-        )
+        self.canvas.coords(self.line_a, left_x, top + 35, left_x, bottom)
+        self.canvas.coords(self.line_b, right_x, top + 35, right_x, bottom)
     
     def add_packet(self, packet_info: Dict):
         """Add a packet arrow to the timeline"""
-        # Store packet for redraw
-        self.packets.append(packet_info)
-        self.packet_count += 1
+        self.add_packets((packet_info,))
+    
+    def add_packets(self, packets: Sequence[Dict]):
+        """Add several packet arrows; the scroll region follows once Tk is idle"""
+        if not packets:
+            return
+        
+        # Only the newest MAX_VISIBLE of the batch can stay on screen
+        self.packets.extend(self._packet_view(packet_info) for packet_info in packets[-self.MAX_VISIBLE:])
+        first = self.packet_count + max(len(packets) - self.MAX_VISIBLE, 0)
+        self.packet_count += len(packets)
+        self.current_y = self.start_y + self.packet_count * self.packet_spacing
         
-        # Draw the packet
-        self._draw_packet(packet_info)
+        # Line positions are the same for the whole batch
+        arrows = self._arrow_xs(*self._get_centered_positions())
+        for index in range(first, self.packet_count):
+            self._draw_packet(self.packets[index - self.packet_count], index, arrows)
+        
+        # All adds in one mainloop pass share a single scroll update
+        if self._scroll_id is None:
+            self._scroll_id = self.after_idle(self._apply_scroll)
+    
+    def _apply_scroll(self):
+        """Move headers and lanes for the packets added since the last call, then auto-scroll"""
+        self._scroll_id = None
+        # Follow new packets only if the user hasn't scrolled up to look at
+        # older ones (measured before the region grows)
+        follow = self.canvas.yview()[1] > 0.95
+        
+        # Dropped packets move the diagram top down
+        self.draw_headers()
+        self.draw_vertical_lines()
         
         # Update scroll region and auto-scroll
         self._update_scroll_region()
-        self.canvas.yview_moveto(1.0)
+        if follow:
+            self.canvas.yview_moveto(1.0)
     
-    def _draw_packet(self, packet_info: Dict):
-        """Draw a single packet arrow"""
-        left_x, right_x = self._get_centered_positions()
-        
-        sender = packet_info.get("sender", "A")
+    @staticmethod
+    def _packet_view(packet_info: Dict) -> Tuple[bool, str, str, bool]:
+        """(sent by A, color, label, valid) for a packet dict, worked out once per packet"""
         is_valid = packet_info.get("valid", True)
-        is_error = packet_info.get("type") == "ERROR"
         
-        # Determine arrow direction
-        if sender == "A":
-            x1, x2 = left_x, right_x
-        else:
-            x1, x2 = right_x, left_x
-        
-        # Arrow color based on validity
-        if is_error:
+        # Arrow color and label based on type and validity
+        if packet_info.get("type") == "ERROR":
             color = "#ffd93d" if is_valid else "#ff4444"
+            label = "ERROR"
         else:
             color = "#4ade80" if is_valid else "#ff4444"
+            label = _LABEL_FMT(_Defaulting(packet_info))
         
-        # Draw arrow line
-        self.canvas.create_line(
-            x1, self.current_y, x2, self.current_y + 15,
-            fill=color, width=2, arrow=tk.LAST
-        )
+        return packet_info.get("sender", "A") == "A", color, label, is_valid
+    
+    @staticmethod
+    def _arrow_xs(left_x: int, right_x: int) -> Tuple[Tuple[int, int, int], Tuple[int, int, int]]:
+        """(x1, x2, mid_x) of an arrow from B, then from A, for lines at left_x (A) and right_x (B)"""
+        mid_x = (left_x + right_x) // 2
+        return (right_x, left_x, mid_x), (left_x, right_x, mid_x)
+    
+    def _draw_packet(self, view: Tuple[bool, str, str, bool], index: int, arrows):
+        """Draw packet number index (a _packet_view()) as an arrow placed by arrows (see _arrow_xs)"""
+        from_a, color, label, is_valid = view
+        arrow, text, mark = self._slots[index % self.MAX_VISIBLE]
+        y = self.start_y + index * self.packet_spacing
         
-        # Build packet label
-        if is_error:
-            label = "ERROR"
-        else:
-            label = f"s={packet_info.get('seq', 0)} a={packet_info.get('ack', 0)} l={packet_info.get('len', 0)} r={packet_info.get('rwnd', 0)}"
+        # Arrow direction comes from the sender
+        x1, x2, mid_x = arrows[from_a]
+        
+        # Draw arrow line
+        self.canvas.coords(arrow, x1, y, x2, y + 15)
+        self.canvas.itemconfigure(arrow, fill=color, state=tk.NORMAL)
         
         # Draw packet label on arrow
-        mid_x = (x1 + x2) // 2
-        mid_y = self.current_y + 7
-        
-        self.canvas.create_text(
-            mid_x, mid_y - 10,
-            text=label,
-            fill=color,
-            font=("Consolas", 8),
-            anchor=tk.CENTER
-        )
+        mid_y = y + 7
         
-        # Draw validity indicator
-        if not is_valid:
-            self.canvas.create_text(
-                mid_x, mid_y + 12,
-                text="✗",
-                fill="#ff4444",
-                font=("Consolas", 8, "bold")
-            )
+        self.canvas.coords(text, mid_x, mid_y - 10)
+        self.canvas.itemconfigure(text, text=label, fill=color, state=tk.NORMAL)
         
-        # Update position for next packet
-        self.current_y += self.packet_spacing
+        # Draw validity indicator
+        if is_valid:
+            self.canvas.itemconfigure(mark, state=tk.HIDDEN)
+        else:
+            self.canvas.coords(mark, mid_x, mid_y + 12)
+            self.canvas.itemconfigure(mark, state=tk.NORMAL)
     
     def _update_scroll_region(self):
         """Update the scroll region based on content"""
-        canvas_width = max(self.canvas.winfo_width(), 450)
-        self.canvas.configure(scrollregion=(0, 0, canvas_width, self.current_y + 50))
+        region = (0, self._top(), max(self._size[0], 450), self.current_y + 50)
+        if region != self._scroll_region:
+            self._scroll_region = region
+            self.canvas.configure(scrollregion=region)
+    
+    def destroy(self):
+        """Cancel pending scroll/resize updates, then destroy the widget"""
+        for after_id in (self._scroll_id, self._resize_id):
+            if after_id is not None:
+                self.after_cancel(after_id)
+        self._scroll_id = self._resize_id = None
+        super().destroy()
     
     def clear(self):
         """Clear all packets and reset timeline"""
-        self.packets = []
+        self.packets.clear()
         self.packet_count = 0
-        self.current_y = self.start_y
         self._redraw_all()
-
@@ -0,0 +1,71 @@
+"""
+Window helpers for TCP Game
+Tk-thread handoff and widget update caching shared by the host and client windows
+"""
+import tkinter as tk
+import time
+from collections import deque
+
+
+class WindowBase:
+    """Base for the host and client windows: _post() handoff, _set() caches, log timestamps"""
+    
+    def __init__(self, root: tk.Tk):
+        self.root = root
+        self._after = root.after  # Bound once, used by every timer/flush reschedule
+        
+        # Calls handed over from the socket thread, see _post()
+        self._posted = deque()
+        self._drain_pending = False
+        self._drain_id = None
+        
+        # Last value applied per (widget key, option), see _set()
+        self._last = {}
+        self._configures = {}  # Bound configure() per _set() key, cached on first use
+        self._ts_cache = (0, "")  # (epoch second, formatted timestamp)
+    
+    def _post(self, func, *args):
+        """Run func(*args) on the Tk thread (safe to call from the socket thread)
+        
+        Calls are queued and drained by a single after() callback, so a burst
+        of network events costs one Tcl event instead of one per message.
+        """
+        self._posted.append((func, args))
+        if not self._drain_pending:
+            self._drain_pending = True
+            self._drain_id = self._after(0, self._drain_posted)
+    
+    def _drain_posted(self):
+        """Run every call queued by _post() (Tk thread)"""
+        # Clear the flag first so a call posted mid-drain schedules a new drain
+        self._drain_pending = False
+        posted = self._posted
+        while posted:
+            func, args = posted.popleft()
+            func(*args)
+    
+    def _set(self, widget, key: str, **kw):
+        """configure() only the options that changed since the last _set() under key"""
+        changed = {}
+        for option, value in kw.items():
+            if self._last.get((key, option)) != value:
+                self._last[(key, option)] = value
+                changed[option] = value
+        if changed:
+            configure = self._configures.get(key)
+            if configure is None:
+                configure = self._configures[key] = widget.configure
+            configure(**changed)
+    
+    def _set_text(self, widget, key: str, fmt, value):
+        """Show fmt(value) as widget's text; fmt is only called when value changed since the last call under key"""
+        if self._last.get((key, "value")) != value:
+            self._last[(key, "value")] = value
+            self._set(widget, key, text=fmt(value))
+    
+    def _timestamp(self) -> str:
+        """HH:MM:SS for now, formatted at most once per second"""
+        now = int(time.time())
+        if now != self._ts_cache[0]:
+            self._ts_cache = (now, time.strftime("%H:%M:%S", time.localtime(now)))
+        return self._ts_cache[1]
@@ -2,16 +2,53 @@
 Socket Client for TCP Game
 Connects to host and sends/receives game messages
 """
+import queue
+import selectors
 import socket
 import threading
 from typing import Callable, Optional
 
 from tcp_game.networking.protocol import (
-    decode_message, create_packet_message, create_disconnect_message,
-    MSG_STATE_UPDATE, MSG_READY, MSG_DISCONNECT
+    decode_frame, pop_frame, create_packet_message, create_disconnect_message,
+    expand_state_num, MSG_STATE_UPDATE, MSG_STATE_NUM, MSG_READY, MSG_DISCONNECT
 )
 
 
+# Sockets waiting to be closed by the closer thread, see _close_later()
+_close_queue: "queue.Queue[socket.socket]" = queue.Queue()
+_closer_lock = threading.Lock()
+_closer_started = False
+
+
+def _closer():
+    """Closer thread: say goodbye on and close each queued socket, one at a time"""
+    while True:
+        sock = _close_queue.get()
+        try:
+            sock.sendall(create_disconnect_message())
+        except:
+            pass
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except:
+            pass
+        try:
+            sock.close()
+        except:
+            pass
+
+
+def _close_later(sock: socket.socket):
+    """Close sock in the background, on one long-lived thread shared by all clients"""
+    global _closer_started
+    if not _closer_started:
+        with _closer_lock:
+            if not _closer_started:
+                threading.Thread(target=_closer, daemon=True).start()
+                _closer_started = True
+    _close_queue.put(sock)
+
+
 class SocketClient:
     """
     TCP Socket client for connecting to game host.
@@ -29,22 +66,46 @@ class SocketClient:
         self.on_disconnected: Optional[Callable] = None
         self.on_error: Optional[Callable] = None
         
-        # Buffer for incomplete messages
-        self.recv_buffer = ""
+        # Buffer for incomplete frames
+        self.recv_buffer = bytearray()
+        
+        # Last state applied (full update plus later deltas), the base for STATE_NUM deltas
+        self.last_state: Optional[dict] = None
+        
+        # Bumped per connection so a stale receive thread knows to exit quietly
+        self._generation = 0
+        
+        # Write end of the current receive thread's wakeup socketpair; closing
+        # it makes the thread's select() return, see _receive_loop()
+        self._wakeup: Optional[socket.socket] = None
+        
+        # Message type -> handler, see _handle_message()
+        self._handlers = {
+            MSG_READY: self._on_ready,
+            MSG_STATE_UPDATE: self._on_state_update,
+            MSG_STATE_NUM: self._on_state_num,
+            MSG_DISCONNECT: self._on_disconnect,
+        }
     
     def connect(self, host: str = "127.0.0.1", port: int = 5555) -> bool:
         """Connect to host server (blocking)"""
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(10.0)  # Connection timeout
-            self.socket.connect((host, port))
-            self.socket.settimeout(None)
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.settimeout(10.0)  # Connection timeout
+            sock.connect((host, port))
+            sock.settimeout(None)
+            # Packets are tiny one-off writes; don't let Nagle hold them back
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._generation += 1
+            self.socket = sock
             self.running = True
             self.connected = True
-            self.recv_buffer = ""  # Clear buffer on reconnect
+            self.recv_buffer = bytearray()  # Clear buffer on reconnect
+            self.last_state = None
+            wakeup_r, self._wakeup = socket.socketpair()
             
             # Start receive thread
-            recv_thread = threading.Thread(target=self._receive_loop, daemon=True)
+            recv_thread = threading.Thread(target=self._receive_loop, args=(sock, wakeup_r, self._generation), daemon=True)
             recv_thread.start()
             
             return True
@@ -61,54 +122,89 @@ class SocketClient:
         connect_thread = threading.Thread(target=_connect, daemon=True)
         connect_thread.start()
     
-    def _receive_loop(self):
-        """Receive state updates from server"""
+    def _receive_loop(self, sock: socket.socket, wakeup: socket.socket, generation: int):
+        """
+        Receive state updates from server on sock until it closes or reset()
+        is called. Sleeps in select() until sock has data or disconnect()
+        closes the other end of wakeup, so an idle client costs no wakeups.
+        """
+        sel = selectors.DefaultSelector()
         try:
-            while self.running and self.connected:
-                try:
-                    self.socket.settimeout(0.5)
-                    data = self.socket.recv(4096)
-                    
-                    if not data:
-                        self.connected = False
-                        if self.on_disconnected:
-                            self.on_disconnected()
-                        break
-                    
-                    # Add to buffer and process complete messages
-                    self.recv_buffer += data.decode("utf-8")
-                    self._process_buffer()
-                    
-                except socket.timeout:
-                    continue
+            sel.register(sock, selectors.EVENT_READ)
+            sel.register(wakeup, selectors.EVENT_READ)
+            while self.running and self.connected and generation == self._generation:
+                if any(key.fileobj is wakeup for key, _ in sel.select()):
+                    break  # disconnect() or reset()
+                
+                # Room for a whole full state update in one call
+                data = sock.recv(65536)
+                
+                if generation != self._generation:
+                    break
+                
+                if not data:
+                    self.connected = False
+                    if self.on_disconnected:
+                        self.on_disconnected()
+                    break
+                
+                # Add to buffer and process complete messages
+                self.recv_buffer += data
+                self._process_buffer()
         except Exception as e:
+            if generation != self._generation:
+                return
             self.connected = False
             if self.on_disconnected:
                 self.on_disconnected()
+        finally:
+            sel.close()
+            wakeup.close()
     
     def _process_buffer(self):
-        """Process complete messages from buffer"""
-        while "\n" in self.recv_buffer:
-            line, self.recv_buffer = self.recv_buffer.split("\n", 1)
-            if line.strip():
-                msg = decode_message(line.encode("utf-8"))
-                if msg:
-                    self._handle_message(msg)
+        """Process complete frames from buffer"""
+        while True:
+            frame = pop_frame(self.recv_buffer)
+            if frame is None:
+                break
+            msg = decode_frame(*frame)
+            if msg:
+                self._handle_message(msg)
     
     def _handle_message(self, msg: dict):
         """Handle received message"""
-        msg_type = msg.get("type")
-        
-        if msg_type == MSG_READY:
-            if self.on_connected:
-                self.on_connected()
-        elif msg_type == MSG_STATE_UPDATE:
-            if self.on_state_update:
-                self.on_state_update(msg)
-        elif msg_type == MSG_DISCONNECT:
-            self.connected = False
-            if self.on_disconnected:
-                self.on_disconnected()
+        handler = self._handlers.get(msg.get("type"))
+        if handler:
+            handler(msg)
+    
+    def _on_ready(self, msg: dict):
+        """Host accepted us"""
+        if self.on_connected:
+            self.on_connected()
+    
+    def _on_state_update(self, msg: dict):
+        """Full state update: the new base for deltas"""
+        self.last_state = msg
+        if self.on_state_update:
+            self.on_state_update(msg)
+    
+    def _on_state_num(self, msg: dict):
+        """Numeric delta against the last state applied"""
+        # Meaningless without a full update to apply it to
+        if self.last_state is None:
+            return
+        state = expand_state_num(msg, self.last_state)
+        if state is None:
+            return
+        self.last_state = state
+        if self.on_state_update:
+            self.on_state_update(state)
+    
+    def _on_disconnect(self, msg: dict):
+        """Host said goodbye"""
+        self.connected = False
+        if self.on_disconnected:
+            self.on_disconnected()
     
     def send_packet(self, seq: int, ack: int, length: int, rwnd: int, is_error: bool = False):
         """Send a packet to the host"""
@@ -129,21 +225,23 @@ class SocketClient:
         sock = self.socket
         self.socket = None
         
+        # Wake the receive thread before its socket goes away
+        wakeup = self._wakeup
+        self._wakeup = None
+        if wakeup:
+            wakeup.close()
+        
         if sock:
-            def _close_socket():
-                try:
-                    sock.sendall(create_disconnect_message())
-                except:
-                    pass
-                try:
-                    sock.shutdown(socket.SHUT_RDWR)
-                except:
-                    pass
-                try:
-                    sock.close()
-                except:
-                    pass
-            
             # Close socket in background to not block GUI
-            close_thread = threading.Thread(target=_close_socket, daemon=True)
-            close_thread.start()
+            _close_later(sock)
+    
+    def reset(self):
+        """
+        Drop the current connection and per-connection state so the instance
+        can connect() again. Callbacks are kept; the old receive thread exits
+        without firing any of them.
+        """
+        self._generation += 1
+        self.disconnect()
+        self.recv_buffer = bytearray()
+        self.last_state = None
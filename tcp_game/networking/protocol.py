@@ -1,17 +1,95 @@
 """
 Protocol for TCP Game network communication
-JSON-based message serialization/deserialization
+Length-prefixed frames: JSON messages, plus compact binary frames for
+packets and numbers-only state updates
 """
 import json
-from dataclasses import dataclass, asdict
-from typing import Optional, Dict, Any, List
+import re
+import struct
+from dataclasses import dataclass, fields, astuple
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple, Union
+
+from tcp_game.core.game_state import HistorySnapshot
+
+# JSON bodies go through orjson when it is installed (pip install tcp_game[fast]),
+# else through msgspec if that is; the stdlib fallback reads and writes the same frames
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+# The fast encoders only handle 64-bit integers: they refuse to encode bigger
+# ones and may decode them as floats, so bodies that may hold one use the stdlib
+# (19 digits already goes past int64 from -9223372036854775809 down)
+_LONG_DIGITS = re.compile(rb"\d{19}")
+
+_DECODE_ERRORS: Tuple[type, ...] = (ValueError,)  # Malformed JSON (incl. an empty body) or invalid UTF-8
+if orjson is not None:
+    _fast_dumps, _fast_loads = orjson.dumps, orjson.loads
+    _ENCODE_ERRORS: Tuple[type, ...] = (TypeError,)
+elif msgspec is not None:
+    _fast_dumps, _fast_loads = msgspec.json.Encoder().encode, msgspec.json.Decoder().decode
+    _ENCODE_ERRORS = (TypeError, OverflowError, msgspec.EncodeError)
+    _DECODE_ERRORS += (msgspec.DecodeError,)
+else:
+    _fast_dumps = None
+
+if _fast_dumps is not None:
+    def _dumps(obj: Any) -> bytes:
+        try:
+            return _fast_dumps(obj)
+        except _ENCODE_ERRORS:
+            return _json_dumps(obj)
+    
+    def _loads(data: bytes) -> Any:
+        if _LONG_DIGITS.search(data):
+            return json.loads(data)
+        return _fast_loads(data)
+else:
+    _dumps = _json_dumps
+    _loads = json.loads  # Takes the UTF-8 bytes as they are
 
 # Message types
 MSG_PACKET = "PACKET"
 MSG_STATE_UPDATE = "STATE_UPDATE"
+MSG_STATE_NUM = "STATE_NUM"
 MSG_DISCONNECT = "DISCONNECT"
 MSG_READY = "READY"
 
+# Frame header: frame type, body length
+_HEADER = struct.Struct("!HI")
+HEADER_SIZE = _HEADER.size
+MAX_FRAME_BODY = 1 << 24  # Anything longer is treated as a corrupt stream
+
+# Frame types
+FRAME_JSON = 0  # Body is a JSON message dict
+FRAME_PACKET = 1  # Body is _PACKET
+FRAME_STATE_NUM = 2  # Body is a uint16 field mask + the masked fields, see _delta_struct()
+
+# seq, ack, length, rwnd, is_error
+_PACKET = struct.Struct("!iiii?")
+_MASK = struct.Struct("!H")
+# Struct code per STATE_NUM_FIELDS entry (current_turn is sent as "is B")
+_STATE_NUM_CODES = "?iiiiii?i?b??"
+
+# Packets of history carried by a full state update (the newest ones);
+# the client already has everything older
+HISTORY_TAIL = 64
+
+# Debug aid: send every message as a JSON frame (receivers accept both)
+WIRE_JSON = False
+
 
 @dataclass
 class PacketMessage:
@@ -31,6 +109,15 @@ class PacketMessage:
             "rwnd": self.rwnd,
             "is_error": self.is_error
         }
+    
+    def encode(self) -> bytes:
+        """Encode as a binary PACKET frame (JSON if a value doesn't fit)"""
+        if not WIRE_JSON:
+            try:
+                return _frame(FRAME_PACKET, _PACKET.pack(self.seq, self.ack, self.length, self.rwnd, self.is_error))
+            except struct.error:
+                pass
+        return encode_message(self.to_dict())
 
 
 @dataclass  
@@ -50,45 +137,198 @@ class StateUpdate:
     player_b_bytes_sent: int
     last_message: str
     last_valid: bool
-    packet_history: List[Dict]
+    packet_history: Union[List[Dict], HistorySnapshot]  # Snapshot is expanded by to_dict()
     opponent_sent_invalid: bool = False
     reset_timer: bool = True  # Whether client should reset their timer
     game_time_left: int = 300  # Game timer (seconds remaining)
     game_over: bool = False  # Whether game has ended
+    history_start: int = 0  # Absolute index of packet_history[0]
     
     def to_dict(self) -> Dict[str, Any]:
+        msg = {"type": MSG_STATE_UPDATE}
+        for f in fields(self):
+            msg[f.name] = getattr(self, f.name)
+        if isinstance(self.packet_history, HistorySnapshot):
+            msg["packet_history"] = self.packet_history.to_list()
+        return msg
+    
+    def encode(self) -> bytes:
+        """Encode as a JSON frame"""
+        return encode_message(self.to_dict())
+
+
+# Fields carried by a STATE_NUM message, in wire order
+STATE_NUM_FIELDS = (
+    "current_turn", "score_a", "score_b", "player_a_rwnd", "player_b_rwnd",
+    "player_a_next_seq", "player_b_next_seq", "opponent_sent_invalid",
+    "game_time_left", "game_over", "last_message", "last_valid", "reset_timer",
+)
+
+# Status messages a STATE_NUM message can carry (sent as their index)
+STATE_NUM_MESSAGES = ("", "RWND increased +20")
+
+STATE_NUM_ALL = (1 << len(STATE_NUM_FIELDS)) - 1  # Field mask with every field set
+
+
+@lru_cache(maxsize=None)
+def _delta_struct(mask: int) -> struct.Struct:
+    """Struct for a STATE_NUM body: the mask, then the fields whose bit is set"""
+    codes = "".join(code for i, code in enumerate(_STATE_NUM_CODES) if mask >> i & 1)
+    return struct.Struct("!H" + codes)
+
+
+@dataclass
+class StateNum:
+    """
+    Numbers-only state update, for updates that add no packets and carry
+    one of STATE_NUM_MESSAGES. The client keeps the packet history (and
+    any other field) from the last full StateUpdate.
+    
+    Encoded as a delta: only fields that differ from base (the values the
+    receiver already has, see state_num_values) go on the wire, flagged in
+    a field mask.
+    """
+    current_turn: str
+    score_a: int
+    score_b: int
+    player_a_rwnd: int
+    player_b_rwnd: int
+    player_a_next_seq: int
+    player_b_next_seq: int
+    opponent_sent_invalid: bool
+    game_time_left: int
+    game_over: bool
+    message_index: int
+    last_valid: bool
+    reset_timer: bool
+    
+    def _delta(self, base: Optional[tuple]) -> Tuple[int, List[Any]]:
+        """(field mask, changed values) relative to base (None = everything)"""
+        values = astuple(self)
+        if base is None:
+            return STATE_NUM_ALL, list(values)
+        mask = 0
+        changed = []
+        for i, (value, old) in enumerate(zip(values, base)):
+            if value != old:
+                mask |= 1 << i
+                changed.append(value)
+        return mask, changed
+    
+    def to_dict(self, base: Optional[tuple] = None) -> Dict[str, Any]:
+        mask, changed = self._delta(base)
         return {
-            "type": MSG_STATE_UPDATE,
-            **asdict(self)
+            "type": MSG_STATE_NUM,
+            "m": mask,
+            "v": changed,
         }
+    
+    def encode(self, base: Optional[tuple] = None) -> bytes:
+        """Encode as a binary STATE_NUM delta frame (JSON if a value doesn't fit)"""
+        if not WIRE_JSON:
+            mask, changed = self._delta(base)
+            if mask & 1:
+                changed[0] = changed[0] == "B"
+            try:
+                return _frame(FRAME_STATE_NUM, _delta_struct(mask).pack(mask, *changed))
+            except struct.error:
+                pass
+        return encode_message(self.to_dict(base))
+
+
+def state_num_values(update) -> tuple:
+    """
+    STATE_NUM_FIELDS values a receiver holds after getting update (a
+    StateUpdate or StateNum); the base for the next StateNum delta.
+    """
+    if isinstance(update, StateNum):
+        return astuple(update)
+    message = update.last_message
+    return (
+        update.current_turn, update.score_a, update.score_b,
+        update.player_a_rwnd, update.player_b_rwnd,
+        update.player_a_next_seq, update.player_b_next_seq,
+        update.opponent_sent_invalid, update.game_time_left, update.game_over,
+        STATE_NUM_MESSAGES.index(message) if message in STATE_NUM_MESSAGES else -1,
+        update.last_valid, update.reset_timer,
+    )
+
+
+def _frame(frame_type: int, body: bytes) -> bytes:
+    """Prefix body with its frame header"""
+    return _HEADER.pack(frame_type, len(body)) + body
+
+
+def parse_header(header: bytes) -> Tuple[int, int]:
+    """Return (frame type, body length) from a HEADER_SIZE header; ValueError if corrupt"""
+    frame_type, length = _HEADER.unpack(header)
+    if length > MAX_FRAME_BODY:
+        raise ValueError(f"Frame too long ({length} bytes)")
+    return frame_type, length
+
+
+def pop_frame(buffer: bytearray) -> Optional[Tuple[int, bytes]]:
+    """Remove the first complete frame from buffer and return (frame type, body), or None if incomplete"""
+    if len(buffer) < HEADER_SIZE:
+        return None
+    frame_type, length = parse_header(buffer[:HEADER_SIZE])
+    end = HEADER_SIZE + length
+    if len(buffer) < end:
+        return None
+    body = bytes(buffer[HEADER_SIZE:end])
+    del buffer[:end]
+    return frame_type, body
 
 
 def encode_message(msg: Dict[str, Any]) -> bytes:
-    """Encode a message dict to bytes for sending over socket"""
-    json_str = json.dumps(msg) + "\n"  # Newline as message delimiter
-    return json_str.encode("utf-8")
+    """Encode a message dict as a JSON frame for sending over socket"""
+    return _frame(FRAME_JSON, _dumps(msg))
 
 
 def decode_message(data: bytes) -> Optional[Dict[str, Any]]:
-    """Decode bytes received from socket to message dict"""
+    """Decode the body of a JSON frame to message dict"""
     try:
-        json_str = data.decode("utf-8").strip()
-        if not json_str:
-            return None
-        return json.loads(json_str)
-    except (json.JSONDecodeError, UnicodeDecodeError):
+        return _loads(data)
+    except _DECODE_ERRORS:
         return None
 
 
+def decode_frame(frame_type: int, body: bytes) -> Optional[Dict[str, Any]]:
+    """Decode a frame body of any type to message dict (None if malformed or unknown)"""
+    try:
+        if frame_type == FRAME_JSON:
+            return decode_message(body)
+        if frame_type == FRAME_PACKET:
+            seq, ack, length, rwnd, is_error = _PACKET.unpack(body)
+            return PacketMessage(seq, ack, length, rwnd, is_error).to_dict()
+        if frame_type == FRAME_STATE_NUM:
+            mask, *values = _delta_struct(_MASK.unpack_from(body)[0]).unpack(body)
+            if mask & 1:
+                values[0] = "B" if values[0] else "A"
+            return {"type": MSG_STATE_NUM, "m": mask, "v": values}
+    except struct.error:
+        pass
+    return None
+
+
 def create_packet_message(seq: int, ack: int, length: int, rwnd: int, is_error: bool = False) -> bytes:
     """Create and encode a packet message"""
-    msg = PacketMessage(seq, ack, length, rwnd, is_error)
-    return encode_message(msg.to_dict())
+    return PacketMessage(seq, ack, length, rwnd, is_error).encode()
 
 
-def create_state_update(game_state, last_message: str, last_valid: bool, reset_timer: bool = True, game_time_left: int = 300, game_over: bool = False) -> bytes:
-    """Create and encode a state update from GameState object"""
-    update = StateUpdate(
+def build_state_update(game_state, last_message: str, last_valid: bool, reset_timer: bool = True, game_time_left: int = 300, game_over: bool = False,
+                       history_from: Optional[int] = None) -> StateUpdate:
+    """
+    Snapshot a GameState object into a StateUpdate (no encoding yet).
+    packet_history holds the newest HISTORY_TAIL packets, or only those from
+    absolute index history_from on when the receiver already has the rest.
+    """
+    count = game_state.history_count
+    start = max(count - HISTORY_TAIL, 0)
+    if history_from is not None and start < history_from <= count:
+        start = history_from
+    history = game_state.history_snapshot(start)
+    return StateUpdate(
         current_turn=game_state.current_turn.value,
         score_a=game_state.score_a,
         score_b=game_state.score_b,
@@ -100,15 +340,63 @@ def create_state_update(game_state, last_message: str, last_valid: bool, reset_t
         player_b_bytes_sent=game_state.player_b.bytes_sent_total,
         last_message=last_message,
         last_valid=last_valid,
-        packet_history=game_state.packet_history,
+        packet_history=history,
         opponent_sent_invalid=game_state.opponent_sent_invalid,
         reset_timer=reset_timer,
         game_time_left=game_time_left,
-        game_over=game_over
+        game_over=game_over,
+        history_start=history.start
     )
+
+
+def create_state_update(game_state, last_message: str, last_valid: bool, reset_timer: bool = True, game_time_left: int = 300, game_over: bool = False) -> bytes:
+    """Create and encode a state update from GameState object"""
+    update = build_state_update(game_state, last_message, last_valid, reset_timer, game_time_left, game_over)
     return encode_message(update.to_dict())
 
 
+def build_state_num(game_state, last_message: str, last_valid: bool, reset_timer: bool = True, game_time_left: int = 300, game_over: bool = False) -> StateNum:
+    """Snapshot a GameState object into a StateNum (last_message must be in STATE_NUM_MESSAGES)"""
+    return StateNum(
+        current_turn=game_state.current_turn.value,
+        score_a=game_state.score_a,
+        score_b=game_state.score_b,
+        player_a_rwnd=game_state.player_a.rwnd,
+        player_b_rwnd=game_state.player_b.rwnd,
+        player_a_next_seq=game_state.player_a.next_seq,
+        player_b_next_seq=game_state.player_b.next_seq,
+        opponent_sent_invalid=game_state.opponent_sent_invalid,
+        game_time_left=game_time_left,
+        game_over=game_over,
+        message_index=STATE_NUM_MESSAGES.index(last_message),
+        last_valid=last_valid,
+        reset_timer=reset_timer
+    )
+
+
+def expand_state_num(msg: Dict[str, Any], base: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Turn a received STATE_NUM delta into a full state update dict, taking
+    the fields it doesn't carry from base (the last state applied).
+    Returns None if the message is malformed.
+    """
+    mask = msg.get("m")
+    values = msg.get("v")
+    if not isinstance(mask, int) or not 0 <= mask <= STATE_NUM_ALL or not isinstance(values, list):
+        return None
+    names = [name for i, name in enumerate(STATE_NUM_FIELDS) if mask >> i & 1]
+    if len(values) != len(names):
+        return None
+    state = dict(base)
+    state.update(zip(names, values))
+    if "last_message" in names:
+        index = state["last_message"]
+        if not isinstance(index, int) or not 0 <= index < len(STATE_NUM_MESSAGES):
+            return None
+        state["last_message"] = STATE_NUM_MESSAGES[index]
+    return state
+
+
 def create_disconnect_message() -> bytes:
     """Create a disconnect notification message"""
     return encode_message({"type": MSG_DISCONNECT})
@@ -2,13 +2,15 @@
 Socket Server for TCP Game
 Handles incoming connections and packet processing from remote client
 """
+import asyncio
 import socket
 import threading
-import time
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 
 from tcp_game.networking.protocol import (
-    decode_message, create_state_update, create_ready_message,
+    decode_frame, parse_header, build_state_update, create_ready_message, state_num_values,
+    StateUpdate, StateNum,
+    HEADER_SIZE,
     MSG_PACKET, MSG_DISCONNECT, MSG_READY
 )
 
@@ -16,14 +18,13 @@ from tcp_game.networking.protocol import (
 class SocketServer:
     """
     TCP Socket server for hosting the game.
-    Runs in background thread, calls callbacks on main thread.
+    Runs an asyncio event loop in a background thread; callbacks are called
+    on that thread, so the host window hands them over to Tk itself.
     """
     
     def __init__(self, host: str = "0.0.0.0", port: int = 5555):
         self.host = host
         self.port = port
-        self.socket: Optional[socket.socket] = None
-        self.client_socket: Optional[socket.socket] = None
         self.running = False
         self.connected = False
         
@@ -33,144 +34,181 @@ class SocketServer:
         self.on_client_disconnected: Optional[Callable] = None
         self.on_error: Optional[Callable] = None
         
-        # Buffer for incomplete messages
-        self.recv_buffer = ""
+        # Event loop (owned by the server thread) and the current client's writer
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        
+        # (writer, state_num_values of the last update sent to it), the base
+        # for StateNum deltas; only touched by send_state()
+        self._num_base: Optional[tuple] = None
+        
+        # Disable Nagle on accepted client sockets, see set_tcp_nodelay();
+        # on by default since every write is a small, interactive update
+        self.tcp_nodelay = True
+        
+        # Message type -> handler, see _handle_message()
+        self._handlers = {
+            MSG_PACKET: self._on_packet,
+            MSG_DISCONNECT: self._on_disconnect,
+        }
+    
+    def set_tcp_nodelay(self, enabled: bool = True):
+        """
+        Send small writes immediately instead of letting Nagle's algorithm
+        hold them back (applies to the current and all later clients).
+        """
+        self.tcp_nodelay = enabled
+        writer = self._writer
+        if writer:
+            self._apply_tcp_nodelay(writer)
+    
+    def _apply_tcp_nodelay(self, writer: asyncio.StreamWriter):
+        """Set TCP_NODELAY on the writer's socket to match self.tcp_nodelay"""
+        sock = writer.get_extra_info("socket")
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(self.tcp_nodelay))
+        except OSError:
+            pass
     
     def start(self) -> bool:
         """Start the server and begin listening"""
+        loop = asyncio.new_event_loop()
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.socket.bind((self.host, self.port))
-            self.socket.listen(1)
-            self.running = True
-            
-            # Start accept thread
-            accept_thread = threading.Thread(target=self._accept_loop, daemon=True)
-            accept_thread.start()
-            
-            return True
+            self._server = loop.run_until_complete(asyncio.start_server(
+                self._handle_client, self.host, self.port, reuse_address=True, backlog=1
+            ))
         except Exception as e:
+            loop.close()
             if self.on_error:
                 self.on_error(f"Failed to start server: {e}")
             return False
+        
+        self._loop = loop
+        self.running = True
+        
+        # Serve in the background - keeps listening after a client disconnects
+        loop_thread = threading.Thread(target=self._run_loop, daemon=True)
+        loop_thread.start()
+        
+        return True
     
-    def _accept_loop(self):
-        """Wait for client connections - keeps listening after disconnect"""
+    def _run_loop(self):
+        """Server thread: run the event loop until stop()"""
+        loop = self._loop
+        asyncio.set_event_loop(loop)
         try:
-            self.socket.settimeout(1.0)  # Allow periodic check for shutdown
-            while self.running:
-                try:
-                    client, addr = self.socket.accept()
-                    
-                    # Close old client if exists
-                    if self.client_socket:
-                        try:
-                            self.client_socket.close()
-                        except:
-                            pass
-                    
-                    self.client_socket = client
-                    self.connected = True
-                    self.recv_buffer = ""  # Clear buffer for new connection
-                    
-                    if self.on_client_connected:
-                        self.on_client_connected(addr)
-                    
-                    # Send ready message
-                    self.client_socket.sendall(create_ready_message())
-                    
-                    # Start receive loop (blocks until disconnect)
-                    self._receive_loop()
-                    
-                    # After receive loop ends, continue accepting new connections
-                    # (don't break - keep listening)
-                    
-                except socket.timeout:
-                    continue
-        except Exception as e:
-            if self.running and self.on_error:
-                self.on_error(f"Accept error: {e}")
+            loop.run_forever()
+        finally:
+            self._server.close()
+            # _shutdown closed the client, so its handler is just seeing EOF
+            loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(loop), return_exceptions=True))
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
     
-    def _receive_loop(self):
-        """Receive packets from client"""
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one client connection until it disconnects or is replaced"""
+        # Close old client if exists
+        if self._writer:
+            self._writer.close()
+        
+        self._apply_tcp_nodelay(writer)
+        self._writer = writer
+        self.connected = True
+        
+        if self.on_client_connected:
+            self.on_client_connected(writer.get_extra_info("peername"))
+        
+        # Send ready message
+        writer.write(create_ready_message())
+        
         try:
-            while self.running and self.connected:
-                try:
-                    self.client_socket.settimeout(0.5)
-                    data = self.client_socket.recv(4096)
-                    
-                    if not data:
-                        self.connected = False
-                        if self.on_client_disconnected:
-                            self.on_client_disconnected()
-                        break
-                    
-                    # Add to buffer and process complete messages
-                    self.recv_buffer += data.decode("utf-8")
-                    self._process_buffer()
-                    
-                except socket.timeout:
-                    continue
-        except Exception as e:
-            self.connected = False
-            if self.on_client_disconnected:
-                self.on_client_disconnected()
-    
-    def _process_buffer(self):
-        """Process complete messages from buffer"""
-        while "\n" in self.recv_buffer:
-            line, self.recv_buffer = self.recv_buffer.split("\n", 1)
-            if line.strip():
-                msg = decode_message(line.encode("utf-8"))
+            while self.running and self.connected and self._writer is writer:
+                frame_type, length = parse_header(await reader.readexactly(HEADER_SIZE))
+                msg = decode_frame(frame_type, await reader.readexactly(length))
                 if msg:
                     self._handle_message(msg)
+        except Exception:
+            # EOF (IncompleteReadError), reset or a corrupt frame header
+            pass
+        finally:
+            writer.close()
+            # A replaced client goes away quietly; the current one reports it once
+            if self._writer is writer:
+                self._writer = None
+                if self.connected and self.running:
+                    self.connected = False
+                    if self.on_client_disconnected:
+                        self.on_client_disconnected()
     
     def _handle_message(self, msg: dict):
         """Handle received message"""
-        msg_type = msg.get("type")
-        
-        if msg_type == MSG_PACKET:
-            if self.on_packet_received:
-                self.on_packet_received(
-                    msg.get("seq", 0),
-                    msg.get("ack", 0),
-                    msg.get("length", 0),
-                    msg.get("rwnd", 0),
-                    msg.get("is_error", False)
-                )
-        elif msg_type == MSG_DISCONNECT:
-            self.connected = False
-            if self.on_client_disconnected:
-                self.on_client_disconnected()
+        handler = self._handlers.get(msg.get("type"))
+        if handler:
+            handler(msg)
+    
+    def _on_packet(self, msg: dict):
+        """Packet sent by the client (dropped if a field isn't an integer, e.g. a float from JSON)"""
+        fields = (msg.get("seq", 0), msg.get("ack", 0), msg.get("length", 0), msg.get("rwnd", 0))
+        if not all(type(value) is int for value in fields):
+            return
+        if self.on_packet_received:
+            self.on_packet_received(*fields, bool(msg.get("is_error", False)))
+    
+    def _on_disconnect(self, msg: dict):
+        """Client said goodbye"""
+        self.connected = False
+        if self.on_client_disconnected:
+            self.on_client_disconnected()
     
     def send_state_update(self, game_state, last_message: str, last_valid: bool, reset_timer: bool = True, game_time_left: int = 300, game_over: bool = False):
         """Send game state update to client"""
-        if self.connected and self.client_socket:
-            try:
-                data = create_state_update(game_state, last_message, last_valid, reset_timer, game_time_left, game_over)
-                self.client_socket.sendall(data)
-            except Exception as e:
-                if self.on_error:
-                    self.on_error(f"Send error: {e}")
-                self.connected = False
+        self.send_state(build_state_update(game_state, last_message, last_valid, reset_timer, game_time_left, game_over))
+    
+    def send_state(self, update: Union[StateUpdate, StateNum]):
+        """Encode an already built state update and queue it on the event loop (safe to call from any thread)"""
+        loop, writer = self._loop, self._writer
+        if self.connected and writer:
+            if isinstance(update, StateNum):
+                base = self._num_base
+                data = update.encode(base[1] if base and base[0] is writer else None)
+            else:
+                data = update.encode()
+            self._num_base = (writer, state_num_values(update))
+            asyncio.run_coroutine_threadsafe(self._send(writer, data), loop)
+    
+    async def _send(self, writer: asyncio.StreamWriter, data: bytes):
+        """Write data to writer, waiting while the client is not keeping up"""
+        if writer is not self._writer or writer.is_closing():
+            return
+        try:
+            writer.write(data)
+            await writer.drain()
+        except Exception as e:
+            if self.on_error:
+                self.on_error(f"Send error: {e}")
+            self.connected = False
     
     def stop(self):
         """Stop the server"""
         self.running = False
         self.connected = False
         
-        if self.client_socket:
-            try:
-                self.client_socket.close()
-            except:
-                pass
-        
-        if self.socket:
+        loop = self._loop
+        if loop and not loop.is_closed():
             try:
-                self.socket.close()
-            except:
-                pass
+                loop.call_soon_threadsafe(self._shutdown)
+            except RuntimeError:
+                pass  # Loop closed in the meantime
+    
+    def _shutdown(self):
+        """Close the client connection and stop the event loop (server thread)"""
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        self._loop.stop()
     
     def get_local_ip(self) -> str:
         """Get local IP address for display"""